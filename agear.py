@@ -1,16 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2020.1.30'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
-import csv
+import dafif
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
 import math
-import geojson
+import geoencode
 from collections import OrderedDict
+from itertools import groupby
 
+TABLES = ['ARPT', 'AGEAR', 'APPC_ABSORBING_SYS', 'APPC_ENGAGING_DEV'] # DAFIF tables read (dafif.py)
 
 def main():
     """ agear.py parses the NGA's DAFIF for Arresting Gear information.
@@ -30,12 +32,19 @@ def main():
                         help='filter for acceptable countries (e.g. "US CA")')
     parser.add_argument('-t', metavar = 'TYPE', default= '',
                         help='filter for acceptable system type (e.g. "MA-1 BAK-15")')
+    parser.add_argument('-m', metavar = ('FILE', 'COUNTRY', 'TYPE'), nargs = 3,
+                        action = 'append', default = [],
+                        help = 'additional output with its own filters (\'\' for none), repeatable '
+                        '(e.g. -m barrier.geojson "" "MA-1 BAK-15")')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d = args.d
     f_out = args.f
     country_filter = args.c
     type_filter = args.t
-    if len(d) < 1 or len(f_out) < 1:
+    outputs = args.m
+    if len(d) < 1 or (len(f_out) < 1 and not outputs):
         # Identify files
         # http://stackoverflow.com/a/3579625
         Tk().withdraw()  # we don't want a full GUI so hide the root window
@@ -66,99 +75,128 @@ def main():
                 except:
                     type_filter = ''
     if len(d) > 0 and len(f_out) > 0:
-        f_agear = d + '\\ARPT\\AGEAR.txt'
-        f_arpt = d + '\\ARPT\\ARPT.txt'
-        f_appc_ab = d + '\\APPC\\APPC_ABSORBING_SYS.txt'
-        f_appc_en = d + '\\APPC\\APPC_ENGAGING_DEV.txt'
-        # Parse APPC_ABSORBING_SYS.txt
-        ab_type = {}
-        with open(f_appc_ab, 'r') as f:
-            for row in csv.reader(f, delimiter='\t'):
-                ab_type[row[0]] = row[1]
-        # Parse APPC_ENGAGING_DEV.txt
-        en_type = {}
-        with open(f_appc_en, 'r') as f:
-            for row in csv.reader(f, delimiter='\t'):
-                en_type[row[0]] = row[1]
-        # Parse ARPT.txt
-        arpt = {}
-        with open(f_arpt, 'r') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter='\t')
-            # https://www.idiotinside.com/2015/09/18/csv-json-pretty-print-python/
-            title = reader.fieldnames
-            for row in reader:
-                row_dict = ({title[i]:row[title[i]] for i in range(len(title))})
-                arpt[row_dict['ARPT_IDENT']] = {}
-                arpt[row_dict['ARPT_IDENT']]['NAME'] = row_dict['NAME']
-                arpt[row_dict['ARPT_IDENT']]['ICAO'] = row_dict['ICAO'] if len(row_dict['ICAO']) > len(row_dict['FAA_HOST_ID']) else row_dict['FAA_HOST_ID']
-                arpt[row_dict['ARPT_IDENT']]['WGS_DLAT'] = row_dict['WGS_DLAT']
-                arpt[row_dict['ARPT_IDENT']]['WGS_DLONG'] = row_dict['WGS_DLONG']
-        # Parse AGEAR.txt
-        agear = []
-        with open(f_agear, 'r') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter='\t')
-            # https://www.idiotinside.com/2015/09/18/csv-json-pretty-print-python/
-            title = reader.fieldnames
-            for i, row in enumerate(reader):
-                row_dict = ({title[i]:row[title[i]] for i in range(len(title))})
-                agear.append({})
-                agear[i]['ARPT_IDENT'] = row_dict['ARPT_IDENT']
-                agear[i]['RWY_IDENT'] = row_dict['RWY_IDENT']
-                agear[i]['LOCATION'] = str(int(row_dict['LOCATION']))
-                agear[i]['TYPE'] = row_dict['TYPE']
+        outputs.insert(0, (f_out, country_filter, type_filter))
+    if len(d) > 0 and outputs:
+        variants(d, outputs, compress=args.z)
+
+def build(d, f_out, country_filter='', type_filter='', conn=None, arpt_rows=None,
+          compress=False):
+    """ build writes airports with arresting gear to GeoJSON.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        f_out: full path to output file (*.geojson, *.json)
+        country_filter (optional): string e.g. 'US CA'
+        type_filter (optional): string e.g. 'MA-1 BAK-15'
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        arpt_rows (optional): shared ARPT rows e.g. from ccx.py
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    variants(d, [(f_out, country_filter, type_filter)], conn=conn,
+             arpt_rows=arpt_rows, compress=compress)
+
+def variants(d, outputs, conn=None, arpt_rows=None, compress=False):
+    """ variants writes airports with arresting gear to several GeoJSON
+        outputs, each with its own filters, loading the tables once.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        outputs: list of (f_out, country_filter, type_filter) e.g.
+            [('agear.geojson', '', ''), ('barrier.geojson', '', 'MA-1 BAK-15')]
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        arpt_rows (optional): shared ARPT rows e.g. from ccx.py
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    close = conn is None
+    if close:
+        conn = dafif.connect(d, tables=TABLES)
+    # Query APPC_ABSORBING_SYS
+    ab_type = {}
+    for row in conn.execute('SELECT * FROM APPC_ABSORBING_SYS'):
+        ab_type[row[0]] = row[1]
+    # Query APPC_ENGAGING_DEV
+    en_type = {}
+    for row in conn.execute('SELECT * FROM APPC_ENGAGING_DEV'):
+        en_type[row[0]] = row[1]
+    # Query ARPT (only airports with arresting gear) unless shared
+    if arpt_rows is None:
+        arpt_rows = conn.execute('SELECT * FROM ARPT WHERE ARPT_IDENT IN '
+                                 '(SELECT ARPT_IDENT FROM AGEAR)')
+    arpt = {}
+    for row_dict in arpt_rows:
+        arpt[row_dict['ARPT_IDENT']] = {}
+        arpt[row_dict['ARPT_IDENT']]['NAME'] = row_dict['NAME']
+        arpt[row_dict['ARPT_IDENT']]['ICAO'] = row_dict['ICAO'] if len(row_dict['ICAO']) > len(row_dict['FAA_HOST_ID']) else row_dict['FAA_HOST_ID']
+        arpt[row_dict['ARPT_IDENT']]['WGS_DLAT'] = row_dict['WGS_DLAT']
+        arpt[row_dict['ARPT_IDENT']]['WGS_DLONG'] = row_dict['WGS_DLONG']
+    # Query AGEAR (country filters by ARPT_IDENT index) once for every output
+    specs = [(f_out, tuple(country_filter.upper().split()),
+              type_filter.upper().split())
+             for f_out, country_filter, type_filter in outputs]
+    where, params = '', []
+    if all(country for f_out, country, types in specs):
+        where, params = dafif.glob('ARPT_IDENT', sorted(set(
+            c for f_out, country, types in specs for c in country)))
+        where = ' WHERE ' + where
+    agear = []
+    for row_dict in conn.execute('SELECT * FROM AGEAR' + where + ' ORDER BY rowid',
+                                 params):
+        agear.append({
+            'ARPT_IDENT': row_dict['ARPT_IDENT'],
+            'RWY_IDENT': row_dict['RWY_IDENT'],
+            'TYPE': row_dict['TYPE'],
+            'LOCATION': row_dict['LOCATION'],
+        })
+    if close:
+        conn.close()
+    features = {} # ARPT_IDENT: (IDENT, NAME, Point) shared by outputs
+    for f_out, country, types in specs:
         # Filter airports
-        for i in range(len(agear)-1,-1,-1):
-            if country_filter != '':
-                if agear[i]['ARPT_IDENT'][0:2] not in country_filter.upper():
-                    del agear[i]
-                    continue
-            if type_filter != '':
-                # https://stackoverflow.com/a/25102099
-                if len([s for s in [ab_type[agear[i]['TYPE'][:-2]],en_type[agear[i]['TYPE'][-2:]]] if any(xs in s for xs in type_filter.upper().split())]) == 0:
-                    del agear[i]
-                    continue
-        # Build GeoJSON
-        ARPT_IDENT = ''
-        rwy = {}
-        r = 0
+        rows = agear
+        if country:
+            rows = [row for row in rows if row['ARPT_IDENT'].startswith(country)]
+        # Name the systems of the gear left (APPC codes looked up only for
+        # airports in the country filter, once for all outputs)
+        for row in rows:
+            if 'SYSTEM' not in row:
+                ab = ab_type[row['TYPE'][:-2]]
+                en = en_type[row['TYPE'][-2:]]
+                row['SYSTEM'] = [ab, en]
+                row['TEXT'] = (str(int(row['LOCATION'])) + '&#8242 (' + ab + '/' +
+                               en + ')')
+        if types:
+            # https://stackoverflow.com/a/25102099
+            rows = [row for row in rows if any(any(xs in s for xs in types)
+                                               for s in row['SYSTEM'])]
+        # Build GeoJSON (one feature per run of ARPT_IDENT, each RWY_IDENT
+        # listing consecutive gear on separate lines)
         fc = []
-        #print(agear)
-        #agear.update({len(agear) + 1: {'ARPT_IDENT': ''}})
-        agear.append(agear[0])
-        #print(agear)
-        for i in range(0,len(agear)):
-            if (agear[i]['ARPT_IDENT'] != ARPT_IDENT and len(rwy) > 0) or i == len(agear)-1:
-                d = OrderedDict()
-                d['IDENT'] = arpt[agear[i-1]['ARPT_IDENT']]['ICAO']
-                d['NAME'] = arpt[agear[i-1]['ARPT_IDENT']]['NAME']
-                # The RWY separator character is called an "interpunct"·
-                d['RWY'] = ' · '.join('<span class=\'details\' title=\'' +
-                                      str(value[0]) + '\'>' + str(key)  +
-                                      '</span>' for key, value in rwy.items())
+        for ARPT_IDENT, rows_ident in groupby(rows, key=lambda row: row['ARPT_IDENT']):
+            rwy = {}
+            RWY_IDENT = None
+            for row in rows_ident:
+                if row['RWY_IDENT'] != RWY_IDENT:
+                    rwy[row['RWY_IDENT']] = row['TEXT']
+                else:
+                    rwy[row['RWY_IDENT']] += '&#10;' + row['TEXT']
+                RWY_IDENT = row['RWY_IDENT']
+            if ARPT_IDENT not in features:
                 # (Lon, Lat) because https://github.com/frewsxcv/python-geojson#point)
-                p = geojson.Point((float(arpt[agear[i-1]['ARPT_IDENT']]['WGS_DLONG']),
-                                   float(arpt[agear[i-1]['ARPT_IDENT']]['WGS_DLAT'])))
-                fc.append(geojson.Feature(geometry=p, properties=d))
-                ARPT_IDENT = agear[i]['ARPT_IDENT']
-                rwy = {}
-                r = 0
-            if rwy == {}:
-                rwy[agear[i]['RWY_IDENT']] = [agear[i]['LOCATION'] + '&#8242 (' +
-                                              ab_type[agear[i]['TYPE'][:-2]] + '/' + 
-                                              en_type[agear[i]['TYPE'][-2:]] + ')']
-                ARPT_IDENT = agear[i]['ARPT_IDENT']
-                continue
-            if agear[i]['RWY_IDENT'] != agear[i-1]['RWY_IDENT']:
-                rwy[agear[i]['RWY_IDENT']] = [agear[i]['LOCATION'] + '&#8242 (' +
-                                              ab_type[agear[i]['TYPE'][:-2]] + '/' + 
-                                              en_type[agear[i]['TYPE'][-2:]] + ')']
-            else:
-                rwy[agear[i]['RWY_IDENT']] = [rwy[agear[i]['RWY_IDENT']][0] + '&#10;' +
-                          agear[i]['LOCATION'] + '&#8242 (' +
-                          ab_type[agear[i]['TYPE'][:-2]] + '/' + 
-                          en_type[agear[i]['TYPE'][-2:]] + ')']
-        with open(f_out, 'w', newline='', encoding='utf-8') as f:
-            f.write(geojson.dumps(geojson.FeatureCollection(fc)))
+                features[ARPT_IDENT] = (
+                    arpt[ARPT_IDENT]['ICAO'], arpt[ARPT_IDENT]['NAME'],
+                    geoencode.geometry('Point', (float(arpt[ARPT_IDENT]['WGS_DLONG']),
+                                                 float(arpt[ARPT_IDENT]['WGS_DLAT']))))
+            ident, name, p = features[ARPT_IDENT]
+            properties = OrderedDict()
+            properties['IDENT'] = ident
+            properties['NAME'] = name
+            # The RWY separator character is called an "interpunct"·
+            properties['RWY'] = ' · '.join('<span class=\'details\' title=\'' +
+                                           value + '\'>' + str(key) +
+                                           '</span>' for key, value in rwy.items())
+            fc.append(geoencode.feature(p, properties))
+        with geoencode.output(f_out, compress) as f:
+            geoencode.dump(geoencode.feature_collection(fc), f, ensure_ascii=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+from tkinter import Tk
+from tkinter.filedialog import askdirectory
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import fuel
+import time
+
+PORT = 8000
+
+
+def main():
+    """ aircard-server.py serves AIR Card FBO Locator pages recorded by
+        fuel.py (-r) on localhost, so that scraping can be tested and
+        benchmarked offline (fuel.py -u http://localhost:8000).
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Serves recorded AIR Card FBO Locator pages for fuel.py.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-d', metavar = 'PATH', default = '',
+                        help = 'full path to directory of recorded responses (fuel.py -r)')
+    parser.add_argument('-p', metavar = 'PORT', default = PORT, type=int,
+                        help = 'port on localhost (int)')
+    parser.add_argument('-l', metavar = 'LATENCY', default = 0, type=float,
+                        help = 'delay before each response (s) to stand in for the site')
+    args = parser.parse_args()
+    d = args.d
+    if len(d) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        d = askdirectory(title='Select the folder of recorded responses')
+    if len(d) > 0:
+        serve(d, args.p, args.l)
+
+def serve(d, port=PORT, latency=0):
+    """ serve replays the recorded responses until interrupted.
+
+    Args:
+        d: full path to directory of recorded responses (fuel.py -r)
+        port (optional): int e.g. 8000
+        latency (optional): delay before each response (s) e.g. 0.5
+    """
+    server = ThreadingHTTPServer(('localhost', port), handler(d, latency))
+    print('Serving ' + d + ' at http://localhost:' + str(server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def handler(d, latency=0):
+    """ handler returns a request handler answering each request with the
+        response recorded for it (see fuel.recording), or 404.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1' # keep-alive, as fuel.py expects
+
+        def do_GET(self):
+            self.replay(None)
+
+        def do_POST(self):
+            self.replay(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+
+        def replay(self, body):
+            time.sleep(latency)
+            try:
+                with open(d + '\\' + fuel.recording(self.command, self.path, body), 'rb') as f:
+                    page = f.read()
+                self.send_response(200)
+            except OSError:
+                page = ('Not recorded: ' + self.command + ' ' + self.path).encode('utf-8')
+                self.send_response(404)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, format, *args):
+            pass # quiet, as many sessions may be scraping
+    return Handler
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+from tkinter import Tk
+from tkinter.filedialog import askdirectory
+import dafif
+import hashlib
+import importlib  # synth-dafif.py
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import sys
+import time
+try:
+    import resource # peak RSS (POSIX)
+except ImportError:
+    resource = None
+    import tracemalloc # peak Python allocations otherwise
+
+REPEAT = 1 # runs of each case timed (the best is reported)
+GOLDEN = 'bench.golden.json'
+# (case, script, arguments, outputs) with arguments formatted with the
+# "DAFIFT" directory {d} and output directory {o} (the order of ccx.py)
+CASES = (
+    ('agear', 'agear.py', ['-d', '{d}', '-f', '{o}\\agear.geojson'], ['agear.geojson']),
+    ('barrier', 'agear.py', ['-d', '{d}', '-f', '{o}\\barrier.geojson', '-t', 'MA-1 BAK-15'],
+     ['barrier.geojson']),
+    ('tacan', 'iap.py', ['-d', '{d}', '-f', '{o}\\tacan.geojson', '-l', '6000', '-w', '100',
+                         '-t', 'T'], ['tacan.geojson']),
+    ('iap', 'iap.py', ['-d', '{d}', '-f', '{o}\\iap.geojson', '-l', '8000', '-w', '150'],
+     ['iap.geojson']),
+    ('suas', 'suas.py', ['-d', '{d}', '-f', '{o}\\suas.geojson', '-c', 'US CA JA KS'],
+     ['suas.geojson']),
+    ('suas everything', 'suas.py', ['-d', '{d}', '-f', '{o}\\suas everything.geojson',
+                                    '-m', '{o}\\suas everything.topojson', '', '',
+                                    '-m', '{o}\\suas everything.drx', '', ''],
+     ['suas everything.geojson', 'suas everything.topojson', 'suas everything.drx']),
+    ('mtr', 'mtr.py', ['-d', '{d}', '-f', '{o}\\mtr.geojson'], ['mtr.geojson']),
+    ('mtr_label', 'mtr_label.py', ['-d', '{d}', '-f', '{o}\\mtr_label.geojson'],
+     ['mtr_label.geojson']),
+    ('merge-geojson', 'merge-geojson.py',
+     ['-i', '{o}\\agear.geojson', '{o}\\tacan.geojson', '{o}\\suas.geojson',
+      '{o}\\mtr.geojson', '{o}\\mtr_label.geojson', '-o', '{o}\\ccx.geojson'],
+     ['ccx.geojson']),
+)
+
+
+def main():
+    """ bench.py times the CCX tools on a DAFIF (e.g. from synth-dafif.py),
+        recording the peak memory of each, and checks every output against
+        the golden output kept from the first run, so that an optimization
+        can never silently change the GeoJSON.
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Times the CCX tools and checks their outputs against golden outputs.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-d', metavar = 'DAFIFT', default = '',
+                        help = 'full path to "DAFIFT" directory (written first if -s)')
+    parser.add_argument('-o', metavar = 'PATH', default = '',
+                        help = 'full path to output directory (golden outputs in "golden")')
+    parser.add_argument('-s', metavar = 'SCALE', default = 0, type=int,
+                        help = 'write a synthetic DAFIF of this size first (see synth-dafif.py)')
+    parser.add_argument('-n', metavar = 'REPEAT', default = REPEAT, type=int,
+                        help = 'runs of each case timed (int)')
+    parser.add_argument('-c', metavar = 'CASE', default = [], nargs = '+',
+                        help = 'cases to run (default all): ' +
+                        ', '.join('"' + c[0] + '"' for c in CASES))
+    parser.add_argument('-g', action = 'store_true',
+                        help = 'replace the golden outputs with these outputs')
+    args = parser.parse_args()
+    d = args.d
+    d_out = args.o
+    if len(d) < 1 or len(d_out) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        d = askdirectory(title='Select the folder "DAFIFT"')
+        if len(d) > 0:
+            d_out = askdirectory(title='Select the output folder')
+    if len(d) > 0 and len(d_out) > 0:
+        if args.s > 0:
+            synth_dafif = importlib.import_module('synth-dafif')
+            synth_dafif.generate(d, args.s)
+        results = bench(d, d_out, args.c, args.n, args.g)
+        print('Case'.ljust(16) + 'Time (s)'.rjust(10) + 'Peak (MB)'.rjust(11) + '  Outputs')
+        for case, result in results.items():
+            print(case.ljust(16) + ('%.2f' % result['time']).rjust(10) +
+                  ('%.1f' % result['peak']).rjust(11) + '  ' +
+                  ', '.join(o + ' ' + status for o, status in result['outputs'].items()))
+        if any(status == 'CHANGED' for result in results.values()
+               for status in result['outputs'].values()):
+            sys.exit('Outputs changed from golden (-g to accept)')
+
+def bench(d, d_out, cases=(), repeat=REPEAT, golden=False):
+    """ bench ingests the DAFIF store, then runs each case as its script
+        would run from the command line, in a process of its own, and
+        compares its outputs with the golden outputs (kept in "golden" and
+        hashed in GOLDEN, with the hashes of the DAFIF files they came from).
+        Golden outputs are kept from the first run on a DAFIF, or replaced
+        if golden.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        d_out: full path to output directory
+        cases (optional): names of CASES to run e.g. ['suas', 'mtr'] (all if empty)
+        repeat (optional): runs of each case timed e.g. 3
+        golden (optional): boolean replace the golden outputs
+
+    Returns:
+        dict of {case: {'time': best (s), 'peak': peak memory (MB),
+                        'outputs': {output: 'same', 'CHANGED' or 'golden'}}}
+    """
+    os.makedirs(d_out, exist_ok=True)
+    os.makedirs(d_out + '\\golden', exist_ok=True)
+    try:
+        with open(d_out + '\\' + GOLDEN, 'r') as f:
+            kept = json.load(f)
+    except (OSError, ValueError):
+        kept = {}
+    inputs = {}
+    for table, f_in, index in dafif.TABLES:
+        if os.path.exists(d + f_in):
+            inputs[f_in] = digest(d + f_in)
+    if kept.get('inputs') != inputs:
+        kept = {'inputs': inputs, 'outputs': {}} # golden outputs of another DAFIF
+    results = {'dafif': run('dafif.py', ['-d', d, '-r'], repeat)}
+    results['dafif']['outputs'] = {}
+    for case, script, arguments, outputs in CASES:
+        if cases and case not in cases:
+            continue
+        arguments = [a.format(d=d, o=d_out) for a in arguments]
+        results[case] = run(script, arguments, repeat)
+        results[case]['outputs'] = {}
+        for output in outputs:
+            h = digest(d_out + '\\' + output)
+            if golden or output not in kept['outputs']:
+                shutil.copyfile(d_out + '\\' + output, d_out + '\\golden\\' + output)
+                kept['outputs'][output] = h
+                status = 'golden'
+            else:
+                status = 'same' if kept['outputs'][output] == h else 'CHANGED'
+            results[case]['outputs'][output] = status
+    with open(d_out + '\\' + GOLDEN, 'w') as f:
+        json.dump(kept, f, indent=1, sort_keys=True)
+    return results
+
+def run(script, arguments, repeat=REPEAT):
+    """ run times a script with arguments (best of repeat runs), each run in
+        a new process (see measure).
+
+    Returns:
+        dict of time (s) and peak memory (MB)
+    """
+    context = multiprocessing.get_context('spawn')
+    result = {'time': None, 'peak': 0}
+    for i in range(max(1, repeat)):
+        parent, child = context.Pipe(duplex=False)
+        p = context.Process(target=measure, args=(script, arguments, child))
+        p.start()
+        child.close()
+        try:
+            t, peak = parent.recv()
+        except EOFError:
+            p.join()
+            raise RuntimeError(script + ' ' + ' '.join(arguments) + ' failed')
+        p.join()
+        if p.exitcode != 0:
+            raise RuntimeError(script + ' ' + ' '.join(arguments) + ' failed')
+        result['time'] = t if result['time'] is None else min(result['time'], t)
+        result['peak'] = max(result['peak'], peak)
+    return result
+
+def measure(script, arguments, conn):
+    """ measure runs a script as __main__ with arguments and sends its wall
+        time (s) and peak memory (MB): resident set size where the resource
+        module is available, else Python allocations (tracemalloc).
+    """
+    d = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, d)
+    sys.argv = [script] + arguments
+    if resource is None:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    runpy.run_path(os.path.join(d, script), run_name='__main__')
+    t = time.perf_counter() - t0
+    if resource is None:
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10 # bytes, else KiB
+    conn.send((t, peak))
+    conn.close()
+
+def digest(f_in):
+    """ digest returns the SHA-256 of a file.
+    """
+    h = hashlib.sha256()
+    with open(f_in, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2023.1.13'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
+import hashlib
+import importlib  # merge-geojson.py
+import json
 import os
+import sys
+import time
+
+# Modules shared by the tools, whose source is part of every fingerprint
+SHARED = ['dafif', 'drx', 'geodesy', 'geoencode', 'merge-geojson', 'topo']
 
 
 def main():
@@ -24,6 +33,16 @@ def main():
                         help = 'full path to Python script directory')
     parser.add_argument('-s', metavar = 'PATH', default = '',
                         help = 'full path to save directory')
+    parser.add_argument('-r', action = 'store_true',
+                        help = 'rebuild every product even if unchanged (ignore ccx.manifest.json)')
+    parser.add_argument('-j', metavar = 'JOBS', default = None, type=int,
+                        help = 'number of products built in parallel (int) (default CPU count)')
+    parser.add_argument('-t', action = 'store_true',
+                        help = 'also cut the web map layers into z/x/y tiles (tile.py)')
+    parser.add_argument('-n', metavar = 'SESSIONS', default = 4, type=int,
+                        help = 'number of sessions for each contract fuel scrape (int)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d_dafift = args.d
     d_python = args.p
@@ -42,46 +61,217 @@ def main():
         d_dafift = d_dafift.replace('/','\\')
         d_python = d_python.replace('/','\\')
         d_save = d_save.replace('/','\\')
-        c1 = 'py -3 "' + d_python + '\\'
-        c2 = '" -d "' + d_dafift + '" -f "' + d_save + '\\'
-        def runthejewels(script, fname, args):
-            """ runthejewels streamlines the script-running process.
-            """
-            if args != '':
-                os.system(c1 + script + c2 + fname + '" ' + args)
-            else:
-                os.system(c1 + script + c2 + fname + '"')
-            print('Updated ' + fname)
-        #script = 'agear.py'
-        #fname = 'agear.geojson'
-        #os.system(c1 + script + c2 + fname + '"')
-        #print('Updated ' + fname)
-        runthejewels('agear.py', 'agear.geojson', '')
-        runthejewels('agear.py', 'barrier.geojson', '-t "MA-1 BAK-15"')
-        runthejewels('suas.py', 'suas.geojson', '-c "US CA JA KS"')
-        runthejewels('suas.py', 'suas everything.geojson', '')
-        runthejewels('mtr.py', 'mtr.geojson', '')
-        runthejewels('mtr_label.py', 'mtr_label.geojson', '')
-        runthejewels('iap.py', 'tacan.geojson', '-l 6000 -w 100 -t T')
-        inputs = ['fueld00.json','fueld26.json',
-                'fueli000.json','fueli050.json',
-                'fueli100.json','fueli150.json',
-                'fueli200.json']
-        runthejewels('fuel.py', 'fuel[0]', '-i1 25 -c US')
-        runthejewels('fuel.py', 'fuel[1]', '-i0 26 -c US')
-        runthejewels('fuel.py', 'fuel[2]', '-i0 0 -i1 49')
-        runthejewels('fuel.py', 'fuel[3]', '-i0 50 -i1 99')
-        runthejewels('fuel.py', 'fuel[4]', '-i0 100 -i1 149')
-        runthejewels('fuel.py', 'fuel[5]', '-i0 150 -i1 199')
-        runthejewels('fuel.py', 'fuel[6]', '-i0 200')
-        #runthejewels('fuel.py', 'fuelc.json', '-c CA')
-        script = 'merge-geojson.py'
-        fname = 'fuel.geojson'
-        inputs = ['fuel[0]', 'fuel[1]', 'fuel[2]', 'fuel[3]', 'fuel[4]', 'fuel[5]', 'fuel[6]']
-        # https://stackoverflow.com/a/12008055
-        # https://stackoverflow.com/a/2050649
-        os.system(c1 + script + '" -o "' + d_save + '\\' + fname + '" -i ' +
-                  '"{}"'.format('" "'.join([d_save + '\\' + s for s in inputs])))
+        # Ingest DAFIF once (before any worker reads the store)
+        if len(d_python) > 0:
+            sys.path.insert(0, d_python)
+        import dafif
+        dafif.connect(d_dafift).close()
+        print('Ingested DAFIF')
+        # Products: script, args, whether ARPT is shared, dependencies,
+        # whether the inputs are volatile (scraped, so rebuilt once a day) and
+        # further (name, args) outputs written in the same pass (variants)
+        # and whether compressed copies are written alongside (compress)
+        # fuel.build scrapes the US states (fuel[0]) and the other countries
+        # (fuel[1]), each across its own pool of sessions (-n), caching each
+        # region so that a failed refresh resumes where it stopped, and
+        # reports ICAO it cannot resolve ("fuel[0].unresolved.csv") instead
+        # of asking (answers go in "fuel overrides.json")
+        fuel_inputs = ['fuel[0]', 'fuel[1]']
+        fuel_cache = d_save + '\\fuel cache'
+        fuel_overrides = d_save + '\\fuel overrides.json'
+        world = [90, -180, -90, 180]
+        def product(script, args=(), arpt=False, deps=[], volatile=False,
+                    variants=[], compress=args.z):
+            return {'script': script, 'args': args, 'arpt': arpt,
+                    'deps': deps, 'volatile': volatile, 'variants': variants,
+                    'compress': compress}
+        products = {
+            'agear.geojson': product('agear', ('', ''), arpt=True, variants=[
+                ('barrier.geojson', ('', 'MA-1 BAK-15'))]),
+            'suas.geojson': product('suas', ('US CA JA KS', world), variants=[
+                ('suas everything.geojson', ('', world)),
+                ('suas everything.topojson', ('', world)),
+                ('suas.drx', ('US CA JA KS', world))]),
+            'mtr.geojson': product('mtr', ('routes',), variants=[
+                ('mtr_label.geojson', ('labels',))]),
+            'tacan.geojson': product('iap', (6000, 100, 'T'), arpt=True, variants=[
+                ('iap.geojson', (8000, 150, '')),
+                ('rnav.geojson', (0, 0, 'R'))]),
+            'fuel[0]': product('fuel', ('US', 0, 0, args.n, fuel_overrides, True,
+                                        fuel_cache), arpt=True, volatile=True),
+            'fuel[1]': product('fuel', ('', 0, 0, args.n, fuel_overrides, True,
+                                        fuel_cache), arpt=True, volatile=True),
+            #'fuelc.json': product('fuel', ('CA',), arpt=True, volatile=True),
+            'fuel.geojson': product('merge-geojson',
+                                    ([d_save + '\\' + s for s in fuel_inputs],),
+                                    deps=fuel_inputs),
+        }
+        if args.t:
+            # "<layer> tiles" directories with index.json
+            for layer in ['suas.geojson', 'mtr.geojson', 'fuel.geojson',
+                          'tacan.geojson', 'agear.geojson']:
+                name = os.path.splitext(layer)[0] + ' tiles'
+                products[name] = product('tile', (d_save + '\\' + layer,
+                                                  d_save + '\\' + name),
+                                         deps=[layer])
+        t = time.perf_counter()
+        failed = schedule(products, d_dafift, d_python, d_save, args.j, args.r)
+        print('Finished in ' + '%.1f' % (time.perf_counter() - t) + ' s' +
+              (' (failed: ' + ', '.join(failed) + ')' if failed else ''))
+        if failed:
+            sys.exit(1)
+
+def schedule(products, d_dafift, d_python, d_save, workers=None, rebuild=False):
+    """ schedule runs each product on a process pool as soon as all of its
+        dependencies have been updated, reporting per-product wall time.
+        Products whose fingerprint matches the build manifest
+        ("ccx.manifest.json" in the save directory) are skipped.
+
+    Args:
+        products: dict of name: dict (see main)
+        d_dafift: full path to "DAFIFT" directory
+        d_python: full path to Python script directory
+        d_save: full path to save directory
+        workers (optional): int size of process pool (default CPU count)
+        rebuild (optional): boolean ignore the build manifest
+
+    Returns:
+        list of names of products failed or skipped for missing inputs
+        (including variants)
+    """
+    f_manifest = d_save + '\\ccx.manifest.json'
+    try:
+        with open(f_manifest, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    hashes = {}
+    pending = dict(products)
+    running = {}
+    done = set()
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=init,
+                             initargs=(d_dafift, d_python)) as pool:
+        while pending or running:
+            n = len(pending)
+            for name, product in list(pending.items()):
+                outputs = [name] + [v for v, a in product['variants']]
+                if any(dep in failed for dep in product['deps']):
+                    print('Skipped ' + name + ' (missing inputs)')
+                    failed.extend(outputs)
+                    del pending[name]
+                elif all(dep in done for dep in product['deps']):
+                    del pending[name]
+                    product['fingerprint'] = fingerprint(product, d_dafift,
+                                                         d_save, hashes)
+                    if (not rebuild and
+                        all(os.path.exists(d_save + '\\' + o) for o in outputs) and
+                        manifest.get(name) == product['fingerprint']):
+                        print('Skipped ' + name + ' (up to date)')
+                        done.update(outputs)
+                    else:
+                        running[pool.submit(run, name, product, d_save)] = name
+            if not running:
+                if len(pending) == n:  # dependencies that will never exist
+                    failed.extend(pending)
+                    break
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                outputs = [name] + [v for v, a in products[name]['variants']]
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    print('Failed ' + name + ': ' + repr(e))
+                    failed.extend(outputs)
+                    manifest.pop(name, None)
+                else:
+                    print('Updated ' + name + ' (' + '%.1f' % seconds + ' s)')
+                    done.update(outputs)
+                    manifest[name] = products[name]['fingerprint']
+                # Record progress so a re-run resumes after a partial failure
+                with open(f_manifest, 'w') as f:
+                    json.dump(manifest, f, indent=1, sort_keys=True)
+    return failed
+
+def fingerprint(product, d_dafift, d_save, hashes):
+    """ fingerprint returns a hash of a product's script and version,
+        arguments, the source of the script and SHARED modules (so a change
+        to any of them rebuilds) and the content of its inputs (DAFIF tables
+        read and products depended upon).  Volatile products also hash the
+        date.
+
+    Args:
+        product: dict (see main)
+        d_dafift: full path to "DAFIFT" directory
+        d_save: full path to save directory
+        hashes: dict of path: content hash (cached across products)
+
+    Returns:
+        string hex digest
+    """
+    import dafif
+    module = importlib.import_module(product['script'])
+    files = dict((table, f_in) for table, f_in, index in dafif.TABLES)
+    inputs = ([module.__file__] +
+              [importlib.import_module(shared).__file__ for shared in SHARED] +
+              [d_dafift + files[table] for table in getattr(module, 'TABLES', [])] +
+              [d_save + '\\' + dep for dep in product['deps']])
+    h = hashlib.sha256(json.dumps([product['script'], module.__version__,
+                                   product['args'], product['variants'],
+                                   product['compress']]).encode())
+    for f_in in inputs:
+        if f_in not in hashes or f_in.startswith(d_save):
+            content = hashlib.sha256()
+            try:
+                with open(f_in, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        content.update(chunk)
+            except OSError:
+                pass
+            hashes[f_in] = content.hexdigest()
+        h.update(hashes[f_in].encode())
+    if product['volatile']:
+        h.update(time.strftime('%Y-%m-%d').encode())
+    return h.hexdigest()
+
+def init(d_dafift, d_python):
+    """ init opens the DAFIF store and ARPT once per worker process.
+    """
+    global worker
+    if len(d_python) > 0:
+        sys.path.insert(0, d_python)
+    import dafif
+    conn = dafif.connect(d_dafift, tables=[])
+    worker = {'d': d_dafift, 'conn': conn, 'arpt_rows': None}
+
+def run(name, product, d_save):
+    """ run builds one product in a worker process and returns wall time (s).
+    """
+    t = time.perf_counter()
+    module = importlib.import_module(product['script'])
+    args = product['args']
+    if product['script'] == 'merge-geojson':
+        module.merge(*args, d_save + '\\' + name, compress=product['compress'])
+    elif product['script'] == 'tile':
+        module.tile(*args, compress=product['compress'])
+    else:
+        kwargs = {'conn': worker['conn'], 'compress': product['compress']}
+        if product['arpt']:
+            if worker['arpt_rows'] is None:
+                worker['arpt_rows'] = worker['conn'].execute(
+                    'SELECT * FROM ARPT ORDER BY rowid').fetchall()
+            kwargs['arpt_rows'] = worker['arpt_rows']
+        if product['variants']:
+            # One pass writing every variant
+            outputs = [(d_save + '\\' + name,) + args]
+            outputs.extend((d_save + '\\' + v,) + a for v, a in product['variants'])
+            module.variants(worker['d'], outputs, **kwargs)
+        else:
+            module.build(worker['d'], d_save + '\\' + name, *args, **kwargs)
+    return time.perf_counter() - t
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+import csv
+from tkinter import Tk
+from tkinter.filedialog import askdirectory
+import math
+import os
+import sqlite3
+
+# (table, file relative to "DAFIFT", indexed columns)
+TABLES = (
+    ('ARPT', '\\ARPT\\ARPT.txt', ('ARPT_IDENT',)),
+    ('RWY', '\\ARPT\\RWY.txt', ('ARPT_IDENT',)),
+    ('AGEAR', '\\ARPT\\AGEAR.txt', ('ARPT_IDENT',)),
+    ('APPC_ABSORBING_SYS', '\\APPC\\APPC_ABSORBING_SYS.txt', ()),
+    ('APPC_ENGAGING_DEV', '\\APPC\\APPC_ENGAGING_DEV.txt', ()),
+    ('TRM_MIN', '\\TRM\\TRM_MIN.txt', ('ARPT_IDENT',)),
+    ('SUAS', '\\SUAS\\SUAS.TXT', ('SUAS_IDENT',)),
+    ('SUAS_CTRY', '\\SUAS\\SUAS_CTRY.TXT', ('SUAS_IDENT',)),
+    ('MTR_OV', '\\MTR\\MTR_OV.txt', ('MTR_IDENT',)),
+)
+R = 3438.1451 # Earth's radius (NM) (geodesy.py)
+# (table, [(lat, lng), ...], [radius, ...] about the last point) for R*Tree
+COORDS = {
+    'ARPT': ([('WGS_DLAT', 'WGS_DLONG')], []),
+    'SUAS': ([('WGS_DLAT1', 'WGS_DLONG1'), ('WGS_DLAT2', 'WGS_DLONG2'),
+              ('WGS_DLAT0', 'WGS_DLONG0')], ['RADIUS1', 'RADIUS2']),
+    'MTR_OV': ([('PT_DLAT', 'PT_DLONG'), ('NX_DLAT', 'NX_DLONG')], []),
+}
+
+
+def main():
+    """ dafif.py ingests the NGA's DAFIF into an indexed SQLite store.
+        Downloads at https://dbgia.geointel.nga.mil/
+        Map at www.robertnordlund.com/ccx/
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Ingests the NGA\'s DAFIF into an indexed SQLite store.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-d', metavar = 'DAFIFT', default = '',
+                        help = 'full path to "DAFIFT" directory')
+    parser.add_argument('-o', metavar = 'DB', default = '',
+                        help = 'full path to SQLite store (default "DAFIFT\\dafif.sqlite")')
+    parser.add_argument('-r', action = 'store_true',
+                        help = 're-ingest every table even if unchanged')
+    args = parser.parse_args()
+    d = args.d
+    if len(d) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        d = askdirectory(title='Select the folder "DAFIFT"')
+    if len(d) > 0:
+        conn = connect(d, db=args.o, force=args.r)
+        for table, f_in, index in TABLES:
+            try:
+                n = conn.execute('SELECT count(*) FROM ' + table).fetchone()[0]
+                print(table + ': ' + str(n))
+            except sqlite3.OperationalError:
+                print(table + ': N/A')
+        conn.close()
+
+def connect(d, db='', tables=None, force=False):
+    """ connect returns a connection to the SQLite store for a "DAFIFT"
+        directory, (re-)ingesting any table whose text file has changed.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        db (optional): full path to SQLite store
+        tables (optional): names of tables required e.g. ['ARPT', 'RWY']
+        force (optional): boolean re-ingest even if unchanged
+
+    Returns:
+        sqlite3.Connection (rows as sqlite3.Row)
+    """
+    if db == '':
+        db = d + '\\dafif.sqlite'
+    conn = sqlite3.connect(db, timeout=60)
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE IF NOT EXISTS _SOURCE '
+                 '(name TEXT PRIMARY KEY, size INTEGER, mtime REAL)')
+    for table, f_in, index in TABLES:
+        if tables is not None and table not in tables:
+            continue
+        try:
+            stat = os.stat(d + f_in)
+        except OSError:
+            continue
+        source = conn.execute('SELECT size, mtime FROM _SOURCE WHERE name = ?',
+                              (table,)).fetchone()
+        if (force or source is None or source['size'] != stat.st_size or
+            source['mtime'] != stat.st_mtime):
+            ingest(conn, table, d + f_in, index)
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO _SOURCE VALUES (?, ?, ?)',
+                             (table, stat.st_size, stat.st_mtime))
+    return conn
+
+def ingest(conn, table, f_in, index=()):
+    """ ingest loads a tab-delimited DAFIF file into a table (all TEXT,
+        original column order), with indexes and an R*Tree if applicable.
+    """
+    with open(f_in, 'r') as f:
+        reader = csv.reader(f, delimiter='\t')
+        title = next(reader)
+        n = len(title)
+        columns = ', '.join('"' + c + '" TEXT' for c in title)
+        with conn:
+            conn.execute('DROP TABLE IF EXISTS ' + table)
+            conn.execute('DROP TABLE IF EXISTS ' + table + '_RTREE')
+            conn.execute('CREATE TABLE ' + table + ' (' + columns + ')')
+            # Pad or trim ragged rows to the header
+            conn.executemany(
+                'INSERT INTO ' + table + ' VALUES (' + ', '.join('?' * n) + ')',
+                ((row + [''] * (n - len(row)))[:n] for row in reader))
+            for c in index:
+                conn.execute('CREATE INDEX ' + table + '_' + c + ' ON ' +
+                             table + ' ("' + c + '")')
+    if table in COORDS:
+        points, radii = COORDS[table]
+        with conn:
+            conn.execute('CREATE VIRTUAL TABLE ' + table + '_RTREE USING '
+                         'rtree(id, min_lat, max_lat, min_lng, max_lng)')
+            rtree = []
+            for row in conn.execute('SELECT rowid, * FROM ' + table):
+                bbox = extent([(row[lat], row[lng]) for lat, lng in points],
+                              [row[r] for r in radii])
+                if bbox is not None:
+                    rtree.append((row['rowid'],) + bbox)
+            conn.executemany('INSERT INTO ' + table + '_RTREE VALUES '
+                             '(?, ?, ?, ?, ?)', rtree)
+
+def extent(points, radii=()):
+    """ extent returns the bounding box (min lat, max lat, min lng, max lng)
+        of (dlat, dlon) points, widened by the largest radius (NM) about the
+        last point (the spherical cap, exactly) and by rounding slack.
+        Boxes wrapping the antimeridian or a pole span all longitudes.
+    """
+    lats = []
+    lngs = []
+    for lat, lng in points:
+        try:
+            lat, lng = float(lat), float(lng)
+        except ValueError:
+            centre = None
+            continue
+        lats.append(lat)
+        lngs.append(lng)
+        centre = (lat, lng)
+    if not lats:
+        return None
+    bbox = [min(lats), max(lats), min(lngs), max(lngs)]
+    try:
+        r = max(float(r) for r in radii if r != '')
+    except ValueError:
+        r = 0
+    if r > 0 and centre is not None:
+        dlat = r / R * 180 / math.pi
+        bbox[0] = min(bbox[0], centre[0] - dlat)
+        bbox[1] = max(bbox[1], centre[0] + dlat)
+        x = math.sin(r / R) / math.cos(centre[0] * math.pi / 180)
+        if bbox[0] <= -90 or bbox[1] >= 90 or x >= 1:
+            bbox[2:] = [-180, 180]
+        else:
+            dlng = math.asin(x) * 180 / math.pi
+            bbox[2] = min(bbox[2], centre[1] - dlng)
+            bbox[3] = max(bbox[3], centre[1] + dlng)
+            if bbox[2] < -180 or bbox[3] > 180:
+                bbox[2:] = [-180, 180]
+    # Vertices are rounded to 4 (lat) and 5 (lng) places
+    bbox = [max(bbox[0] - 1e-4, -90), min(bbox[1] + 1e-4, 90),
+            max(bbox[2] - 1e-4, -180), min(bbox[3] + 1e-4, 180)]
+    return tuple(bbox)
+
+def in_area(table, area):
+    """ in_area returns an SQL clause (and parameters) matching rows of a
+        table whose extent intersects the area given by NW & SE corners
+        [lat, lng, lat, lng], using the table's R*Tree.
+    """
+    return ('rowid IN (SELECT id FROM ' + table + '_RTREE WHERE max_lat >= ? '
+            'AND min_lat <= ? AND max_lng >= ? AND min_lng <= ?)',
+            [area[2], area[0], area[1], area[3]])
+
+def columns(conn, table):
+    """ columns returns the column names of a table in DAFIF order.
+    """
+    return [row[1] for row in conn.execute('PRAGMA table_info(' + table + ')')]
+
+def glob(column, prefixes):
+    """ glob returns an SQL clause (and parameters) matching a column to any
+        of the prefixes e.g. ['US', 'CA'], using the column's index.
+    """
+    return ('(' + ' OR '.join('"' + column + '" GLOB ?' for p in prefixes) + ')',
+            [p + '*' for p in prefixes])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import os
+from xml.sax.saxutils import escape
+
+ENCODING = 'ISO-8859-1'
+NEXT_WIDTH = 10 # digits reserved for the Objects Next attribute
+# Static fragments of JMPS/FalconView Drawing Objects (as append2drx wrote)
+DETAIL = '<Detail><Comment /><Status />'
+COLOR = '<Color red="%d" green="%d" blue="%d" type="%s" />'
+PEN_BACK = COLOR % (255, 0, 0, 'back') # applies when Fill style not "none"
+FILL = '<Fill style="none" />' # uses Pen Color type "back"
+FONT = ('<Font size="12" attributes="0" backtype="none"><Name>Arial</Name>' +
+        COLOR % (0, 0, 0, 'fore') + COLOR % (255, 255, 255, 'back') + '</Font>')
+LABEL = '<Label Display="false">' + FONT + '<String /></Label>' # anchored to first point
+EMBEDDED = '<Embedded text_position="center">' + FONT + '<String /></Embedded>'
+POINT = '<Point><LATITUDE>%s</LATITUDE><LONGITUDE>%s</LONGITUDE></Point>'
+
+
+def start(f_out):
+    """ start opens a JMPS/FalconView Drawing Object XML (*.drx) for
+        streaming to a ".tmp" name (see finish), reserving room for the
+        Objects Next attribute.
+
+    Args:
+        f_out: full path to output file (*.drx, *.xml)
+
+    Returns:
+        drawing: dict of output, file, next object ID and Next attribute offset
+    """
+    f = open(f_out + '.tmp', 'wb')
+    f.write(("<?xml version='1.0' encoding='" + ENCODING + "'?>\n"
+             '<Objects xmlns="urn:JMPS/JMPS" Next="').encode(ENCODING))
+    drawing = {'f_out': f_out, 'file': f, 'next': 0, 'offset': f.tell()}
+    f.write(('0"'.ljust(NEXT_WIDTH + 1) + '>').encode(ENCODING))
+    return drawing
+
+def append(drawing, coordinates, obj='line', tooltip='',
+           color_pen_fore=[255, 255, 255], polygon=False,
+           vRadius=6076, hRadius=6076):
+    """ append writes one Object (rhumb line or ellipse, solid 4 px pen,
+        no fill, hidden Arial 12 label) as soon as it is complete.
+
+    Args:
+        drawing: dict from start
+        coordinates: array of (dlon, dlat) tuples (ellipse centre last)
+        obj (optional): 'line' or 'ellipse'
+        tooltip (optional): string e.g. 'US00001A'
+        color_pen_fore (optional): RGB tuple or array e.g. [255, 255, 255]
+        polygon (optional): boolean e.g. True
+        vRadius, hRadius (optional): ellipse radii (ft)
+    """
+    pen = ('<Pen width="4">' + COLOR % (tuple(color_pen_fore) + ('fore',)) +
+           PEN_BACK + '</Pen>' + FILL)
+    parts = ['<Object ID="' + str(drawing['next']) + '">', DETAIL,
+             '<Tooltip>' + escape(tooltip) + '</Tooltip>' if tooltip else '<Tooltip />',
+             '</Detail>']
+    if obj.lower() == 'ellipse':
+        parts.extend([
+            '<Ellipse style="solid" rotate="0">', pen,
+            '<VRadius>' + str(round(vRadius)) + '</VRadius>',
+            '<HRadius>' + str(round(hRadius)) + '</HRadius>',
+            '<Point type="center"><LATITUDE>' + str(coordinates[-1][1]) +
+            '</LATITUDE><LONGITUDE>' + str(coordinates[-1][0]) +
+            '</LONGITUDE></Point>',
+            LABEL, '</Ellipse>'])
+    else:
+        parts.extend([
+            '<Line style="solid" linetype="rhumb" polygon="' +
+            str(polygon).lower() + '">', pen, LABEL])
+        parts.extend(POINT % (p[1], p[0]) for p in coordinates)
+        parts.extend([EMBEDDED, '</Line>'])
+    parts.append('</Object>')
+    drawing['file'].write(''.join(parts).encode(ENCODING, 'xmlcharrefreplace'))
+    drawing['next'] += 1
+
+def finish(drawing):
+    """ finish closes the Objects element, fills in its Next attribute,
+        closes the file and replaces the output with it.
+    """
+    f = drawing['file']
+    f.write(b'</Objects>')
+    f.seek(drawing['offset'])
+    f.write((str(drawing['next']) + '"').ljust(NEXT_WIDTH + 1).encode(ENCODING))
+    f.close()
+    os.replace(drawing['f_out'] + '.tmp', drawing['f_out'])
+
+def abort(drawing):
+    """ abort closes the file of an unfinished drawing and removes it,
+        leaving the output as it was (nothing to do once finished).
+    """
+    if not drawing['file'].closed:
+        drawing['file'].close()
+        os.remove(drawing['f_out'] + '.tmp')
@@ -1,19 +1,51 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2020.1.30'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
+import csv
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
-import csv
-from splinter import Browser # http://splinter.readthedocs.io/en/latest/
+import dafif
+try:
+    from splinter import Browser # http://splinter.readthedocs.io/en/latest/
+except ImportError:
+    Browser = None # browser backend unavailable
+import hashlib
+import http.client
+import http.cookies
+import json
+import os
+import queue
+import threading
 import time  # used in sleep and timeout
 from bs4 import BeautifulSoup  # used to parse html
+from html.parser import HTMLParser # merchant tables (see MerchantParser)
 import re
-import geojson
+import urllib.parse
+import geoencode
 from collections import OrderedDict
 
+TABLES = ['ARPT'] # DAFIF tables read (dafif.py)
+SESSIONS = 1 # sessions scraping regions at once
+CACHE_TTL = 12 # h a cached region is reused (under a day, as ccx.py refreshes)
+BACKEND = 'http' # 'http' or 'browser' (see scrape)
+SITE = 'https://aircardsys.com'
+AGREE = '/cgi-bin/usage_acceptance?AGREE=1'
+LOCATOR = '/cgi-bin/fbo_locate'
+SEARCH = 'MERCHANT_SUMMARY_SEARCH_MAP_FOR_COUNTRY_STATE' # search button ID
+NO_LOCATIONS = re.compile(r'\balert\s*\(') # the site's alert that a region has none
+POLL = 0.25 # s between checks of the page
+TIMEOUT = 60 # s for a region before it is handed back to the queue
+RETRIES = 3 # attempts per region
+COLUMNS = (0, 1, 2, 5, 10, 11) # merchant table columns kept: merchant, ICAO,
+                               # IATA, name, fuel and phone
+VOID = ('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+        'link', 'meta', 'param', 'source', 'track', 'wbr') # elements without content
+ABBREVIATIONS = {'INTERNATIONAL': 'INTL', 'REGIONAL': 'RGNL', 'MUNICIPAL': 'MUNI',
+                 'AIRFIELD': 'AFLD', 'COUNTY': 'CO', 'MEMORIAL': 'MEML',
+                 'SAINT': 'ST'} # name words (see normalize)
 
 def main():
     """fuel.py is a tool to scrape the AIR Card website for FBO Locator
@@ -35,6 +67,25 @@ def main():
                         help='regions list start index (int)')
     parser.add_argument('-i1', metavar = '', default= 0, type=int,
                         help='regions list end index (int)')
+    parser.add_argument('-n', metavar = 'SESSIONS', default = SESSIONS, type=int,
+                        help='number of sessions scraping at once (int)')
+    parser.add_argument('-b', metavar = 'BACKEND', default = BACKEND,
+                        choices = ['http', 'browser'],
+                        help='scrape over HTTP (falling back to the browser) or with the browser (http, browser)')
+    parser.add_argument('-u', metavar = 'URL', default = SITE,
+                        help='AIR Card site (e.g. http://localhost:8000 for aircard-server.py)')
+    parser.add_argument('-r', metavar = 'PATH', default = '',
+                        help='full path to directory in which to record responses for aircard-server.py')
+    parser.add_argument('-o', metavar = 'FILE', default = '',
+                        help='full path to ICAO override table (*.json) kept with the answers given')
+    parser.add_argument('-a', action = 'store_true',
+                        help='unattended: report unresolved ICAO (FILE.unresolved.csv) instead of asking')
+    parser.add_argument('-k', metavar = 'PATH', default = '',
+                        help='full path to directory caching each region as it is scraped, so a rerun resumes')
+    parser.add_argument('-t', metavar = 'HOURS', default = CACHE_TTL, type=float,
+                        help='hours a cached region is reused (float)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d = args.d
     f_out = args.f
@@ -65,152 +116,708 @@ def main():
         except:
             i1 = 0
     if len(d) > 0 and len(f_out) > 0:
-        # Parse ARPT.txt
-        # arpt_ident = {}
-        f_arpt = d + '\\ARPT\\ARPT.txt'
-        arpt_name = {}
-        arpt_dlat = {}
-        arpt_dlon = {}
-        arpt_ident2 = {}
-        with open(f_arpt, 'r') as f:
-            arpt_raw = csv.reader(f, delimiter='\t')
-            # This skips the first row of the CSV file.
-            next(arpt_raw)
-            for row in arpt_raw:
-                arpt_ident = (row[3] if len(row[3]) > len(row[4]) else row[4])
-                arpt_name[arpt_ident] = row[1]
-                arpt_dlat[arpt_ident] = row[8]
-                arpt_dlon[arpt_ident] = row[10]
-                arpt_ident2[row[19]] = arpt_ident # Alternate ICAO as key
-        # Scrape
-        regioncode = []
-        icao = []
-        iata = []
-        name = []
-        merchant = []
-        fuel = []
-        phone = []
-        with Browser('firefox', headless=True) as browser:  # 'phantomjs'
-            url = 'https://aircardsys.com/cgi-bin/usage_acceptance?AGREE=1'
-            browser.visit(url)
-            if browser.is_text_present('I AGREE', wait_time=1):
-                #browser.find_by_text('I AGREE').click()
-                browser.click_link_by_text('I AGREE')
-            url = 'https://aircardsys.com/cgi-bin/fbo_locate'
-            browser.visit(url)
-            if browser.is_text_present('Select a Merchant'):
-                while browser.is_element_not_present_by_id(
-                    'MERCHANT_SUMMARY_HAS_ACTIVE_CONTRACT'):
-                    #browser.find_by_id().visible
-                    #element['name']
-                    #wait = input('paused')
-                    time.sleep(1)
-                browser.find_by_text('DLA Contract Location').click()
-                print('\nScraping')
-                if len(country) != 0 and len(country) != 2:
-                    country = ''
-                optionid = 'MERCHANT_SUMMARY_COUNTRY'
+        build(d, f_out, country, i0, i1, args.n, args.o, args.a, args.k, args.t,
+              compress=args.z, backend=args.b, site=args.u, record=args.r)
+
+def build(d, f_out, country='', i0=0, i1=0, sessions=SESSIONS, overrides='',
+          batch=False, cache='', ttl=CACHE_TTL, conn=None, arpt_rows=None,
+          compress=False, backend=BACKEND, site=SITE, record=''):
+    """ build scrapes AIR Card, correlates to DAFIF and writes GeoJSON.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        f_out: full path to output file (*.geojson, *.json)
+        country (optional): string e.g. 'US' (states) or 'JA'
+        i0 (optional): regions list start index
+        i1 (optional): regions list end index (exclusive)
+        sessions (optional): number of sessions e.g. 4 (see scrape)
+        overrides (optional): full path to ICAO override table (*.json) of
+            {scraped ICAO: ARPT ident ('' to leave out)}, kept with the
+            answers given when asked
+        batch (optional): boolean write unresolved ICAO to
+            "f_out.unresolved.csv" instead of asking
+        cache (optional): full path to region cache directory (see scrape)
+        ttl (optional): hours a cached region is reused e.g. 12
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        arpt_rows (optional): shared ARPT rows e.g. from ccx.py
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+        backend, site, record (optional): see scrape
+    """
+    # Query ARPT unless shared
+    close = conn is None and arpt_rows is None
+    if close:
+        conn = dafif.connect(d, tables=TABLES)
+    if arpt_rows is None:
+        arpt_rows = conn.execute('SELECT * FROM ARPT ORDER BY rowid')
+    index = resolver(arpt_rows)
+    if close:
+        conn.close()
+    table = {}
+    if overrides:
+        try:
+            with open(overrides, 'r', encoding='utf-8') as f:
+                table = json.load(f)
+        except OSError:
+            pass
+    # Scrape
+    rows = scrape(country, i0, i1, sessions, backend, site, record, cache, ttl)
+    fc = []
+    unresolved = []
+    print('\n')
+    if not rows:
+        print('No locations to correlate')
+    else:
+        print('Correlating')
+        for region, icao, iata, name, merchant, fuel, phone in rows:
+            ident = table.get(icao)
+            if ident:
+                ident = resolve(index, ident)
+            if ident is None:
+                ident = resolve(index, icao, iata, name)
+            while ident is None and not batch:
+                try:
+                    answer = input(icao + ' (' + region + ') (' + name + ') not in DAFIF. '
+                                   'Alternate ICAO (blank to leave out)? ').strip().upper()
+                except EOFError:
+                    batch = True # nobody to ask, so report the rest
+                    break
+                ident = resolve(index, answer) if answer else ''
+                if ident is not None and overrides:
+                    table[icao] = ident
+                    with open(overrides, 'w', newline='', encoding='utf-8') as f:
+                        json.dump(table, f, indent=1, sort_keys=True)
+            if ident is None:
+                unresolved.append((region, icao, iata, name, merchant))
+                continue
+            if not ident:
+                continue # left out
+            d = OrderedDict()
+            d['IDENT'] = ident
+            d['NAME'] = name
+            d['MERCHANT'] = merchant
+            d['FUEL'] = fuel
+            d['PHONE'] = phone
+            dlat, dlon = index['arpt'][ident]
+            print(ident + ' (' + region + '): ' + dlat + ', ' + dlon)
+            # (Lon, Lat) because https://github.com/frewsxcv/python-geojson#point)
+            p = geoencode.geometry('Point', (float(dlon), float(dlat)))
+            fc.append(geoencode.feature(p, d))
+    # Written even if empty, so a layer without locations still merges
+    with geoencode.output(f_out, compress) as f:
+        geoencode.dump(geoencode.feature_collection(fc), f, ensure_ascii=False)
+    f_report = f_out + '.unresolved.csv'
+    if unresolved:
+        print(str(len(unresolved)) + ' unresolved (' + f_report + ')')
+        with open(f_report, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['REGION', 'ICAO', 'IATA', 'NAME', 'MERCHANT'])
+            writer.writerows(unresolved)
+    elif os.path.exists(f_report):
+        os.remove(f_report)
+
+def resolver(arpt_rows):
+    """ resolver returns the index resolving scraped locations to ARPT:
+        coordinates by ident (ICAO, else FAA host ID) and the idents of
+        every alias, built once so each location is a hash lookup.
+
+    Args:
+        arpt_rows: ARPT rows (ARPT_IDENT, NAME, STATE_PROV, ICAO,
+            FAA_HOST_ID, ... SEC_ICAO, ...)
+
+    Returns:
+        dict of 'arpt' {ident: (dlat, dlon)}, 'alias' {ident or SEC_ICAO:
+        ident}, 'faa' {FAA_HOST_ID: ident} and 'name' {normalized NAME:
+        ident} (names shared by airports left out)
+    """
+    arpt = {}
+    sec_icao = {}
+    faa = {}
+    names = {}
+    for row in arpt_rows:
+        ident = (row[3] if len(row[3]) > len(row[4]) else row[4])
+        if not ident:
+            continue
+        arpt[ident] = (row[8], row[10])
+        if row[19]:
+            sec_icao[row[19]] = ident # Alternate ICAO as key
+        if row[4]:
+            faa.setdefault(row[4], ident)
+        key = normalize(row[1])
+        if key:
+            names[key] = ident if names.get(key, ident) == ident else None
+    alias = sec_icao
+    alias.update((ident, ident) for ident in arpt)
+    return {'arpt': arpt, 'alias': alias, 'faa': faa,
+            'name': dict((k, v) for k, v in names.items() if v is not None)}
+
+def resolve(index, icao, iata='', name=''):
+    """ resolve returns the ARPT ident of a scraped location, or None. The
+        ICAO is looked up as an ident or alternate ICAO, then without its
+        first letter (e.g. 'K1O2' as '1O2'), as an FAA host ID, then the
+        IATA as an FAA host ID and lastly the normalized name.
+    """
+    ident = index['alias'].get(icao)
+    if ident is None and icao[1:] in index['arpt']:
+        ident = icao[1:]
+    if ident is None:
+        ident = index['faa'].get(icao) or (index['faa'].get(iata) if iata else None)
+    if ident is None and name:
+        ident = index['name'].get(normalize(name))
+    return ident
+
+def normalize(name):
+    """ normalize returns an airport name in upper case words, abbreviated
+        as DAFIF e.g. 'Chicago O'Hare International Airport' as
+        'CHICAGO O HARE INTL'.
+    """
+    words = re.findall('[A-Z0-9]+', name.upper())
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in words
+                    if word not in ('AIRPORT', 'THE'))
+
+def scrape(country='', i0=0, i1=0, sessions=SESSIONS, backend=BACKEND,
+           site=SITE, record='', cache='', ttl=CACHE_TTL):
+    """ scrape returns the DLA contract locations of the AIR Card FBO Locator
+        for a range of regions, scraped by a pool of sessions. Each session
+        takes the next region from a shared queue as soon as it is free, so
+        a slow region holds up only its own session; a region that times out
+        or fails is put back for any session to retry. With a cache, each
+        region's rows are saved as soon as it is scraped and regions cached
+        within the TTL are not scraped again, so a rerun resumes.
+
+    Args:
+        country (optional): string e.g. 'US' (states) or 'JA' ('' for every
+            country but US and CA)
+        i0 (optional): regions list start index
+        i1 (optional): regions list end index (exclusive)
+        sessions (optional): number of sessions e.g. 4
+        backend (optional): 'http' (replaying the locator form over pooled
+            HTTP connections, falling back to the browser if it fails) or
+            'browser' (headless Firefox)
+        site (optional): AIR Card URL e.g. 'http://localhost:8000' for
+            aircard-server.py
+        record (optional): full path to directory in which the http backend
+            saves every response for aircard-server.py
+        cache (optional): full path to region cache directory ('' for none)
+        ttl (optional): hours a cached region is reused e.g. 12
+
+    Returns:
+        list of (region, icao, iata, name, merchant, fuel, phone) in regions
+        list order
+
+    Raises:
+        RuntimeError if any region failed RETRIES times (once every other
+        region is scraped and cached), so no partial output is written
+    """
+    if len(country) != 0 and len(country) != 2:
+        country = ''
+    backends = {
+        'http': (lambda: http_session(country, site, record), http_region, http_close),
+        'browser': (lambda: browser_session(country, site), browser_region, browser_close)}
+    # The first session lists the regions
+    client = None
+    if backend == 'http':
+        try:
+            client, optionid, regions = http_session(country, site, record)
+        except Exception as e:
+            print('HTTP client failed (' + repr(e) + '), falling back to the browser')
+            backend = 'browser'
+    if client is None:
+        client, optionid, regions = browser_session(country, site)
+    start, region_rows, close = backends[backend]
+    if i0 < 0 or i0 > len(regions) - 1:
+        i0 = 0
+    if i1 <= i0 or i1 > len(regions):
+        i1 = len(regions)
+    if country and country != 'US' and country != 'CA':
+        if country not in regions:
+            close(client)
+            raise ValueError(country + ' not in regions list')
+        i0 = regions.index(country)
+        i1 = i0 + 1
+    tasks = queue.Queue()
+    results = {}
+    for index in range(i0, i1):
+        if country == '' and regions[index] in ('US', 'CA'):
+            continue
+        rows = cached(cache, country, regions[index], ttl) if cache else None
+        if rows is not None:
+            results[index] = rows
+        else:
+            tasks.put((index, 0)) # (regions list index, attempts)
+    failed = []
+    lock = threading.Lock()
+    def work(client):
+        """ work scrapes regions from the queue until it is empty (leaving
+            them to the other sessions if its own fails to start).
+        """
+        try:
+            if client is None:
+                try:
+                    client = start()[0]
+                except Exception as e:
+                    with lock:
+                        print('Session failed to start (' + repr(e) + ')')
+                    return
+            while True:
+                try:
+                    index, attempts = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                region = regions[index]
+                try:
+                    rows = region_rows(client, optionid, region)
+                except Exception as e:
+                    with lock:
+                        if attempts + 1 < RETRIES:
+                            print(str(index) + ' ' + region + ' retry (' + repr(e) + ')')
+                            tasks.put((index, attempts + 1))
+                        else:
+                            print(str(index) + ' ' + region + ' failed (' + repr(e) + ')')
+                            failed.append(region)
+                    continue
+                if cache:
+                    cache_rows(cache, country, region, rows)
+                with lock:
+                    results[index] = rows
+                    print(str(index) + ' ' + region +
+                          (' (' + str(len(rows)) + ')' if rows else ' N/A'))
+        finally:
+            if client is not None:
+                close(client)
+    n = max(1, min(sessions, tasks.qsize()))
+    print('\nScraping ' + str(tasks.qsize()) + ' regions with ' + str(n) +
+          ' ' + backend + ' sessions' +
+          (' (' + str(len(results)) + ' cached)' if results else ''))
+    threads = [threading.Thread(target=work, args=(client if k == 0 else None,))
+               for k in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    while not tasks.empty():
+        failed.append(regions[tasks.get_nowait()[0]]) # no session left to scrape it
+    if failed:
+        # Scraped regions are cached, so a rerun only scrapes these
+        raise RuntimeError('Failed regions: ' + ' '.join(failed))
+    return [row for index in sorted(results) for row in results[index]]
+
+def cache_file(cache, country, region):
+    """ cache_file returns the path of a region in the cache e.g.
+        "C:\\ccx\\fuel cache\\US-TX.json" or "C:\\ccx\\fuel cache\\JA.json".
+    """
+    if country == 'US' or country == 'CA':
+        region = country + '-' + region
+    return cache + '\\' + region + '.json'
+
+def cached(cache, country, region, ttl=CACHE_TTL):
+    """ cached returns the rows of a region scraped within the TTL (hours),
+        or None.
+    """
+    try:
+        with open(cache_file(cache, country, region), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry['time'] > ttl * 3600:
+        return None
+    return [tuple(row) for row in entry['rows']]
+
+def cache_rows(cache, country, region, rows):
+    """ cache_rows saves the rows of a region with the time scraped,
+        replacing the file whole so an interrupted write is never read.
+    """
+    os.makedirs(cache, exist_ok=True)
+    f_cache = cache_file(cache, country, region)
+    with open(f_cache + '.tmp', 'w', newline='', encoding='utf-8') as f:
+        json.dump({'time': time.time(), 'rows': rows}, f, ensure_ascii=False)
+    os.replace(f_cache + '.tmp', f_cache)
+
+def merchant_rows(html, region, details=''):
+    """ merchant_rows returns the DLA contract locations of a region from FBO
+        Locator HTML, streamed through MerchantParser without building a
+        tree (as BeautifulSoup 'html.parser' would find them: every row with
+        a class in a table whose ID contains 'C_ROW').
+
+    Args:
+        html: merchant details (inner HTML) or the whole page
+        region: string e.g. 'JA'
+        details (optional): ID of the element holding the merchant details
+            e.g. 'map_merchant_details', which must contain 'Merchant Name'
+            ('' if html is the merchant details)
+
+    Returns:
+        list of (region, icao, iata, name, merchant, fuel, phone)
+
+    Raises:
+        ValueError if the page has no merchant details (e.g. an expired
+        session, the usage agreement or an error page)
+    """
+    parser = MerchantParser(region, details)
+    parser.feed(html)
+    parser.close()
+    if details and not parser.found:
+        raise ValueError('no merchant details (' + details + ') for ' + region)
+    if parser.short is not None:
+        raise IndexError('merchant row of ' + str(parser.short) + ' columns')
+    return [parser.rows[i] for table in parser.order for i in table]
+
+class MerchantParser(HTMLParser):
+    """ MerchantParser collects the text of only the columns kept (see
+        COLUMNS) of merchant table rows as the HTML is fed, tracking open
+        elements as BeautifulSoup 'html.parser' nests them (no implicit
+        closing, void elements empty, script and style text ignored).
+    """
+    def __init__(self, region, details=''):
+        super().__init__(convert_charrefs=True)
+        self.region = region
+        self.details = details
+        self.found = False # 'Merchant Name' within the details
+        self.rows = [] # in document order (None until a row is closed)
+        self.order = [] # row indexes of each C_ROW table in document order
+        self.stack = [] # names of open elements
+        self.scope = None if details else 0 # depth of the details element
+        self.tables = [] # [depth, row indexes] of open C_ROW tables
+        self.open_rows = [] # [depth, row index, columns seen, {column: text}]
+        self.cells = [] # [depth, text parts] of open kept columns
+        self.skip = 0 # open script and style elements
+        self.tail = '' # end of the details text so far
+        self.short = None # columns of a row with too few
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID:
+            return
+        depth = len(self.stack)
+        self.stack.append(tag)
+        attrs = dict(attrs)
+        if self.scope is None:
+            if self.details and attrs.get('id') == self.details:
+                self.scope = depth + 1
+            return
+        if self.scope < 0:
+            return
+        if tag == 'script' or tag == 'style':
+            self.skip += 1
+        elif tag == 'table' and 'C_ROW' in (attrs.get('id') or ''):
+            self.tables.append([depth, []])
+            self.order.append(self.tables[-1][1])
+        elif tag == 'tr' and self.tables and 'class' in attrs:
+            # A row of nested tables is a row of each (as find_all)
+            for table in self.tables:
+                table[1].append(len(self.rows))
+            self.open_rows.append([depth, len(self.rows), 0, {}])
+            self.rows.append(None)
+        elif tag == 'td':
+            for row in self.open_rows:
+                if row[2] in COLUMNS:
+                    parts = []
+                    row[3][row[2]] = parts
+                    self.cells.append([depth, parts])
+                row[2] += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.stack:
+            self.end(len(self.stack) - 1 - self.stack[::-1].index(tag))
+
+    def end(self, depth):
+        """ end closes the open elements from a depth (0 for all).
+        """
+        for name in self.stack[depth:]:
+            if (name == 'script' or name == 'style') and self.skip:
+                self.skip -= 1
+        del self.stack[depth:]
+        if self.scope is None or self.scope < 0:
+            return
+        if self.details and depth < self.scope:
+            self.scope = -1 # details closed
+        while self.cells and self.cells[-1][0] >= depth:
+            self.cells.pop()
+        while self.open_rows and self.open_rows[-1][0] >= depth:
+            row_depth, index, n, columns = self.open_rows.pop()
+            if n <= max(COLUMNS):
+                self.short = n # (raised once the details are known to be found)
+                continue
+            text = dict((k, ''.join(v).strip()) for k, v in columns.items())
+            self.rows[index] = (self.region, text[1], text[2], text[5], text[0],
+                                text[10], text[11])
+        while self.tables and self.tables[-1][0] >= depth:
+            self.tables.pop()
+
+    def handle_data(self, data):
+        if self.scope is None or self.scope < 0 or self.skip:
+            return
+        if not self.found:
+            self.found = 'Merchant Name' in self.tail + data
+            self.tail = (self.tail + data)[-len('Merchant Name'):]
+        for depth, parts in self.cells:
+            parts.append(data)
+
+    def close(self):
+        super().close()
+        self.end(0) # elements left open end with the document
+
+def browser_session(country='', site=SITE):
+    """ browser_session opens a headless browser at the FBO Locator,
+        accepting the usage agreement and selecting DLA contract locations
+        (and the country, for the states of US or CA).
+
+    Returns:
+        browser, region select element ID and regions list e.g.
+        (Browser, 'MERCHANT_SUMMARY_COUNTRY', ['AE', 'AG', ...])
+    """
+    if Browser is None:
+        raise ImportError('splinter is required for the browser backend')
+    browser = Browser('firefox', headless=True)  # 'phantomjs'
+    try:
+        url = site + AGREE
+        browser.visit(url)
+        if browser.is_text_present('I AGREE', wait_time=1):
+            #browser.find_by_text('I AGREE').click()
+            browser.click_link_by_text('I AGREE')
+        url = site + LOCATOR
+        browser.visit(url)
+        optionid = 'MERCHANT_SUMMARY_COUNTRY'
+        regions = []
+        if browser.is_text_present('Select a Merchant'):
+            if not browser.is_element_present_by_id(
+                'MERCHANT_SUMMARY_HAS_ACTIVE_CONTRACT', wait_time=TIMEOUT):
+                raise TimeoutError('FBO Locator')
+            browser.find_by_text('DLA Contract Location').click()
+            element = browser.find_by_id(optionid)
+            if country == 'US' or country == 'CA':
+                element.select(country)
+                optionid = 'MERCHANT_SUMMARY_STATE'
                 element = browser.find_by_id(optionid)
-                if country == 'US' or country == 'CA':
-                    element.select(country)
-                    optionid = 'MERCHANT_SUMMARY_STATE'
-                    element = browser.find_by_id(optionid)
-                regions = []
-                # http://sqa.stackexchange.com/a/11619
-                for option in element.find_by_tag('option'):
-                    if len(option['value']) != 2:
-                        continue
-                    regions.append(option['value'])
-                    #regions.append(option['text'])
-                if i0 < 0 or i0 > len(regions) - 1:
-                    i0 = 0
-                if i1 <= i0 or i1 > len(regions):
-                    i1 = len(regions)
-                if country and country != 'US' and country != 'CA':
-                    #regions = [country]
-                    i0 = regions.index(country)
-                    i1 = i0 + 1
-                for region in regions[i0:i1]:
-                    if country == '':
-                        if region == 'US' or region == 'CA':
-                            continue
-                    print(str(regions.index(region)), end='')
-                    # http://stackoverflow.com/a/2083996
-                    while True:
-                        element = browser.find_by_id(optionid)
-                        element.select(region)
-                        browser.find_by_id('MERCHANT_SUMMARY_SEARCH_MAP_FOR_COUNTRY'
-                                           '_STATE').click()
-                        print('.', end='')
-                        time.sleep(2)
-                        try:
-                            browser.get_alert().accept()
-                            print(' ' + region + ' N/A')
-                            break
-                        except:
-                            while browser.find_by_id('loading').first.visible:
-                                time.sleep(1)
-                            if browser.is_text_present('Merchant Name', \
-                                                       wait_time=10):
-                                print(' ' + region + ' ', end='')
-                                table = browser.find_by_id(
-                                'map_merchant_details')[0].html
-                                soup = BeautifulSoup(table, 'html.parser')
-                                r = 0
-                                for subtable in soup.find_all('table', {'id' : re.compile('C_ROW')}):
-                                    for row in subtable.find_all('tr', class_=True):
-                                        col = row.find_all('td')
-                                        regioncode.append(region)
-                                        icao.append(col[1].text.strip())
-                                        iata.append(col[2].text.strip())
-                                        name.append(col[5].text.strip())
-                                        merchant.append(col[0].text.strip())
-                                        fuel.append(col[10].text.strip())
-                                        phone.append(col[11].text.strip())
-                                    r = r + 1
-                                print('(' + str(r) + ')', end='')
-                                print('')
-                                break
-                            else:
-                                continue
-        fc = []
-        print('\n')
-        if not name:
-            print('No locations to correlate')
+            # http://sqa.stackexchange.com/a/11619
+            for option in element.find_by_tag('option'):
+                if len(option['value']) != 2:
+                    continue
+                regions.append(option['value'])
+                #regions.append(option['text'])
+    except:
+        browser.quit()
+        raise
+    return browser, optionid, regions
+
+def browser_region(browser, optionid, region):
+    """ browser_region searches one region and returns its DLA contract
+        locations as soon as the merchant details have loaded (or [] if the
+        site alerts that there are none), raising TimeoutError otherwise.
+
+    Returns:
+        list of (region, icao, iata, name, merchant, fuel, phone)
+    """
+    # Clear the previous region's details so they are not mistaken as loaded
+    browser.execute_script(
+        "var e = document.getElementById('map_merchant_details');"
+        "if (e) { e.innerHTML = ''; }")
+    browser.find_by_id(optionid).select(region)
+    browser.find_by_id(SEARCH).click()
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL)
+        try:
+            browser.get_alert().accept()
+            return [] # N/A
+        except:
+            pass
+        if (not browser.find_by_id('loading').first.visible and
+            browser.is_text_present('Merchant Name')):
+            break
+    else:
+        raise TimeoutError(region)
+    return merchant_rows(browser.find_by_id('map_merchant_details')[0].html, region)
+
+def browser_close(browser):
+    """ browser_close quits a browser session.
+    """
+    browser.quit()
+
+def http_session(country='', site=SITE, record=''):
+    """ http_session opens a keep-alive HTTP connection to the FBO Locator,
+        accepting the usage agreement, and reads its search form: the
+        fields a browser would submit with DLA contract locations selected
+        (and the country, for the states of US or CA).
+
+    Returns:
+        client, region select element ID and regions list e.g.
+        ({'conn': HTTPSConnection, ...}, 'MERCHANT_SUMMARY_COUNTRY', ['AE', ...])
+    """
+    url = urllib.parse.urlsplit(site)
+    connection = (http.client.HTTPSConnection if url.scheme == 'https' else
+                  http.client.HTTPConnection)
+    client = {'conn': connection(url.netloc, timeout=TIMEOUT),
+              'base': url.path.rstrip('/'), 'cookies': {}, 'record': record}
+    try:
+        http_request(client, 'GET', AGREE)
+        soup = BeautifulSoup(http_request(client, 'GET', LOCATOR), 'html.parser')
+        form = http_form(client, soup)
+        # DLA contract locations (an option or a checkbox)
+        element = soup.find(id='MERCHANT_SUMMARY_HAS_ACTIVE_CONTRACT')
+        if element is None:
+            raise ValueError('FBO Locator form not found')
+        if element.name == 'select':
+            option = element.find('option', string=re.compile('DLA Contract Location'))
+            form[element['name']] = option.get('value', option.text)
+        else:
+            form[element['name']] = element.get('value', 'on')
+        optionid = 'MERCHANT_SUMMARY_COUNTRY'
+        if country == 'US' or country == 'CA':
+            form[soup.find(id=optionid)['name']] = country
+            optionid = 'MERCHANT_SUMMARY_STATE'
+            if len(http_options(soup, optionid)) == 0:
+                # States listed once the country is submitted
+                fields = list(form.items())
+                soup = BeautifulSoup(http_request(client, client['method'],
+                                                  client['action'], fields),
+                                     'html.parser')
+                form.update((k, v) for k, v in http_form(client, soup).items()
+                            if k not in form)
+        client['form'] = form
+        client['region'] = soup.find(id=optionid)['name']
+        button = soup.find(id=SEARCH)
+        client['search'] = ((button['name'], button.get('value', ''))
+                            if button is not None and button.get('name') else None)
+        regions = http_options(soup, optionid)
+    except:
+        http_close(client)
+        raise
+    return client, optionid, regions
+
+def http_form(client, soup):
+    """ http_form returns the fields of the FBO Locator search form as a
+        browser would submit them, recording its action and method.
+
+    Returns:
+        OrderedDict of name: value
+    """
+    element = soup.find(id='MERCHANT_SUMMARY_COUNTRY')
+    form = element.find_parent('form') if element is not None else None
+    if form is None:
+        raise ValueError('FBO Locator form not found')
+    client['action'] = urllib.parse.urljoin(LOCATOR, form.get('action') or LOCATOR)
+    client['method'] = (form.get('method') or 'GET').upper()
+    fields = OrderedDict()
+    for field in form.find_all(['input', 'select', 'textarea']):
+        name = field.get('name')
+        kind = field.get('type', '').lower()
+        if not name or kind in ('submit', 'button', 'image', 'reset', 'file'):
+            continue
+        if field.name == 'select':
+            option = field.find('option', selected=True) or field.find('option')
+            if option is not None:
+                fields[name] = option.get('value', option.text)
+        elif kind in ('checkbox', 'radio'):
+            if field.has_attr('checked'):
+                fields[name] = field.get('value', 'on')
+        else:
+            fields[name] = field.get('value', field.text if field.name == 'textarea' else '')
+    return fields
+
+def http_options(soup, optionid):
+    """ http_options returns the regions (two letter option values) of a
+        select element.
+    """
+    element = soup.find(id=optionid)
+    if element is None:
+        return []
+    return [option['value'] for option in element.find_all('option')
+            if len(option.get('value', '')) == 2]
+
+def http_region(client, optionid, region):
+    """ http_region submits the search form for one region and returns its
+        DLA contract locations ([] if the site alerts that there are none, as
+        browser_region), raising ValueError if the response has neither.
+
+    Returns:
+        list of (region, icao, iata, name, merchant, fuel, phone)
+    """
+    fields = list(client['form'].items())
+    fields = [(k, region if k == client['region'] else v) for k, v in fields]
+    if client['region'] not in client['form']:
+        fields.append((client['region'], region))
+    if client['search'] is not None:
+        fields.append(client['search'])
+    page = http_request(client, client['method'], client['action'], fields)
+    if 'Merchant Name' not in page and NO_LOCATIONS.search(page):
+        return [] # N/A
+    return merchant_rows(page, region, 'map_merchant_details')
+
+def http_request(client, method, path, fields=None, redirects=5):
+    """ http_request sends a request over the client's keep-alive connection
+        (reconnecting once if the server dropped it), keeping cookies and
+        following redirects, and returns the page (saving it if recording,
+        see recording).
+
+    Args:
+        client: dict from http_session
+        method: 'GET' or 'POST'
+        path: e.g. '/cgi-bin/fbo_locate'
+        fields (optional): list of (name, value) form fields
+
+    Returns:
+        string HTML
+    """
+    body = None
+    headers = {'User-Agent': 'Mozilla/5.0 (ccx fuel.py)', 'Connection': 'keep-alive'}
+    target = path
+    if fields is not None:
+        data = urllib.parse.urlencode(fields)
+        if method == 'POST':
+            body = data.encode('ascii')
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
         else:
-            print('Correlating')
-            for n in range(0, len(name)):
-                d = OrderedDict()
-                query = icao[n]
-                while True:
-                    d['IDENT'] = query
-                    d['NAME'] = name[n]
-                    d['MERCHANT'] = merchant[n]
-                    d['FUEL'] = fuel[n]
-                    d['PHONE'] = phone[n]
-                    try:
-                        print(query + ' (' + regioncode[n] + '): ' +
-                              arpt_dlat[query] + ', ' + arpt_dlon[query])
-                        # (Lon, Lat) because https://github.com/frewsxcv/python-geojson#point)
-                        p = geojson.Point((float(arpt_dlon[query]), \
-                                           float(arpt_dlat[query])))
-                        fc.append(geojson.Feature(geometry=p, properties=d))
-                    except:
-                        try:
-                            query = arpt_ident2[query]
-                        except:
-                            try:
-                                query = icao[n][1:]
-                                test = arpt_name[query] # chucks error if not found
-                            except:
-                                query = input(icao[n] + ' (' + regioncode[n] + \
-                                              ') (' + name[n] + ') not in DAFIF. ' 
-                                              'Alternate ICAO? ')
-                    else:
-                        break
-            with open(f_out, 'w', newline='', encoding='utf-8') as f:
-                f.write(geojson.dumps(geojson.FeatureCollection(fc)))
+            target = path + ('&' if '?' in path else '?') + data
+    if client['cookies']:
+        headers['Cookie'] = '; '.join(k + '=' + v for k, v in client['cookies'].items())
+    for attempt in range(2):
+        try:
+            client['conn'].request(method, client['base'] + target, body, headers)
+            response = client['conn'].getresponse()
+            content = response.read()
+            break
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            client['conn'].close() # reopened by the next request
+            if attempt:
+                raise
+    for header in response.headers.get_all('Set-Cookie') or []:
+        for key, morsel in http.cookies.SimpleCookie(header).items():
+            client['cookies'][key] = morsel.value
+    location = response.headers.get('Location')
+    if response.status in (301, 302, 303, 307, 308) and location and redirects:
+        url = urllib.parse.urlsplit(urllib.parse.urljoin(target, location))
+        page = http_request(client, 'GET', url.path[len(client['base']):] +
+                            ('?' + url.query if url.query else ''),
+                            redirects=redirects - 1)
+    elif response.status >= 400:
+        raise OSError('HTTP ' + str(response.status) + ' ' + method + ' ' + target)
+    else:
+        page = content.decode(response.headers.get_content_charset() or 'ISO-8859-1',
+                              'replace')
+    if client['record']:
+        os.makedirs(client['record'], exist_ok=True)
+        with open(client['record'] + '\\' + recording(method, target, body), 'w',
+                  newline='', encoding='utf-8') as f:
+            f.write(page)
+    return page
+
+def recording(method, target, body=None):
+    """ recording returns the file name under which a response is recorded
+        for aircard-server.py, from the request e.g. 'GET /cgi-bin/fbo_locate'.
+    """
+    key = method + ' ' + target + '\n' + (body or b'').decode('ascii')
+    return hashlib.sha1(key.encode('utf-8')).hexdigest() + '.html'
+
+def http_close(client):
+    """ http_close closes an HTTP session's connection.
+    """
+    client['conn'].close()
 
 
 if __name__ =="__main__":
-    main()
+    main()
\ No newline at end of file
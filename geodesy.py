@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+from functools import lru_cache
+import math
+import numpy as np
+
+R = 3438.1451 # Earth's radius (NM)
+CACHE_SIZE = 4096 # rings and arcs memoized (each)
+
+
+def projection(lat, lng, d, theta):
+    """ projection returns coordinates from bearing (deg true) and range (NM)
+        for every (centre, range, bearing), broadcast together with NumPy
+        e.g. one centre and range with 36 bearings.
+        http://www.movable-type.co.uk/scripts/latlong.html
+
+    Args:
+        lat, lng: centre(s) (deg) scalar or array
+        d: range(s) (NM) scalar or array
+        theta: bearing(s) (deg true) scalar or array
+
+    Returns:
+        list of (dlon, dlat) tuples, dlon rounded to 5 and dlat to 4 places
+    """
+    lat = np.asarray(lat, dtype=float) * math.pi / 180
+    lng = np.asarray(lng, dtype=float) * math.pi / 180
+    d = np.asarray(d, dtype=float)
+    theta = np.asarray(theta, dtype=float) * math.pi / 180
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+    lat2 = np.arcsin(sin_lat * np.cos(d / R) + cos_lat * np.sin(d / R) * np.cos(theta))
+    lng2 = lng + np.arctan2(np.sin(theta) * np.sin(d / R) * cos_lat, np.cos(d / R) - sin_lat * np.sin(lat2))
+    lng2 = (lng2 * 180 / math.pi + 540) % 360 - 180 # normalized +/-180
+    lat2 = lat2 * 180 / math.pi
+    # Python round() (not np.round) so vertices match the scalar formula
+    return [(round(x, 5), round(y, 4)) for x, y in
+            zip(np.atleast_1d(lng2).tolist(), np.atleast_1d(lat2).tolist())]
+
+def bearing(lat1, lng1, lat2, lng2):
+    """ bearing returns bearing(s) (deg true) between points, broadcast
+        together with NumPy e.g. one centre to both ends of an arc.
+        http://www.movable-type.co.uk/scripts/latlong.html
+
+    Returns:
+        ndarray of bearings (deg true)
+    """
+    lat1 = np.asarray(lat1, dtype=float) * math.pi / 180
+    lng1 = np.asarray(lng1, dtype=float) * math.pi / 180
+    lat2 = np.asarray(lat2, dtype=float) * math.pi / 180
+    lng2 = np.asarray(lng2, dtype=float) * math.pi / 180
+    y = np.sin(lng2 - lng1) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(lng2 - lng1)
+    return (np.arctan2(y, x) * 180 / math.pi + 360) % 360
+
+def circle(lat, lng, radii, n=36):
+    """ circle returns closed rings of n vertices about a centre, one per
+        radius (NM), from the ring cache.
+
+    Returns:
+        list of rings, each a tuple of (dlon, dlat) tuples
+    """
+    return [ring(lat, lng, radius, n) for radius in radii]
+
+@lru_cache(maxsize=CACHE_SIZE)
+def ring(lat, lng, radius, n=36):
+    """ ring returns a closed ring of n vertices about a centre (memoized,
+        as stacked sectors and navaid-centred rings share centre and radius).
+
+    Returns:
+        tuple of (dlon, dlat) tuples
+    """
+    points = projection(lat, lng, radius, np.arange(n) * (360 / n))
+    points.append(points[0])
+    return tuple(points)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def arc(lat, lng, radius, lat1, lng1, lat2, lng2, direction, n=36):
+    """ arc returns the vertices of an arc about a centre from point 1
+        towards point 2 (clockwise if direction is 1, else -1), one every
+        360 / n degrees, excluding point 2 (memoized, as adjacent sectors
+        share arcs).
+
+    Returns:
+        tuple of (dlon, dlat) tuples
+    """
+    theta1, theta2 = bearing(lat, lng, [lat1, lat2], [lng1, lng2]).tolist()
+    angdiff = theta2 - theta1
+    if angdiff * direction < 0:
+        angdiff = angdiff + direction * 360
+    i = np.arange(math.ceil(abs(angdiff) / (360 / n)))
+    if len(i) == 0:
+        return ()
+    return tuple(projection(lat, lng, radius, theta1 + direction * i * 360 / n))
+
+def simplify(points, tolerance):
+    """ simplify returns the points of a line or closed ring (Douglas-Peucker)
+        keeping every point further than the tolerance (NM) from the
+        simplified line, the end points, and enough of a ring for a polygon
+        (closed rings are split at the point furthest from the first).
+        Distances are measured on a local equirectangular projection.
+
+    Args:
+        points: list of (dlon, dlat) tuples
+        tolerance: NM e.g. 0.1
+
+    Returns:
+        list of (dlon, dlat) tuples (a subset of points, in order)
+    """
+    n = len(points)
+    if tolerance <= 0 or n < 3:
+        return list(points)
+    xy = np.array(points, dtype=float)
+    # NM east and north of the first point (unwrapped across +/-180)
+    lat0 = xy[0, 1] * math.pi / 180
+    x = ((xy[:, 0] - xy[0, 0] + 180) % 360 - 180) * 60 * math.cos(lat0)
+    y = (xy[:, 1] - xy[0, 1]) * 60
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    if points[0] == points[-1]:
+        if n < 5:
+            return list(points)
+        k = int(np.argmax(x ** 2 + y ** 2))
+        keep[k] = True
+        stack = [(0, k), (k, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        # Distance of points i+1..j-1 from segment i-j
+        dx, dy = x[j] - x[i], y[j] - y[i]
+        px, py = x[i + 1:j] - x[i], y[i + 1:j] - y[i]
+        length2 = dx * dx + dy * dy
+        if length2 > 0:
+            t = np.clip((px * dx + py * dy) / length2, 0, 1)
+        else:
+            t = 0
+        d = np.hypot(px - t * dx, py - t * dy)
+        k = int(np.argmax(d))
+        if d[k] > tolerance:
+            keep[i + 1 + k] = True
+            stack.append((i, i + 1 + k))
+            stack.append((i + 1 + k, j))
+    if points[0] == points[-1] and keep.sum() < 4:
+        # Keep a triangle: the point furthest from the line through the
+        # first point and the one kept opposite it
+        k = int(np.flatnonzero(keep)[1])
+        d = np.abs(x * y[k] - y * x[k])
+        if d.max() == 0:
+            return list(points)
+        keep[int(np.argmax(d))] = True
+    return [p for p, k in zip(points, keep.tolist()) if k]
+
+def cache_info():
+    """ cache_info returns the hits, misses and size of the ring and arc
+        caches e.g. {'ring': CacheInfo(hits=1, misses=2, ...), 'arc': ...}
+    """
+    return {'ring': ring.cache_info(), 'arc': arc.cache_info()}
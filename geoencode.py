@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+from contextlib import contextmanager
+import gzip
+import io
+import json
+import math
+import os
+import queue
+import threading
+try:
+    import brotli # https://pypi.org/project/Brotli/ (optional, for *.br)
+except ImportError:
+    brotli = None
+
+PRECISION = 6 # decimal places of coordinates (as python-geojson)
+BUFFER = 1 << 16 # bytes encoded before they are handed to the compressors
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11 # (compressed once, served many times)
+GEOMETRIES = ('Point', 'MultiPoint', 'LineString', 'MultiLineString',
+              'Polygon', 'MultiPolygon')
+
+
+def geometry(geometry_type, coordinates):
+    """ geometry returns a GeoJSON geometry e.g. ('Point', (dlon, dlat)).
+    """
+    return {'type': geometry_type, 'coordinates': coordinates}
+
+def feature(geometry, properties):
+    """ feature returns a GeoJSON Feature of a geometry and properties.
+    """
+    return {'type': 'Feature', 'geometry': geometry, 'properties': properties}
+
+def feature_collection(features):
+    """ feature_collection returns a GeoJSON FeatureCollection of features.
+    """
+    return {'type': 'FeatureCollection', 'features': features}
+
+def iterencode(obj, precision=PRECISION, separators=(', ', ': '),
+               ensure_ascii=True):
+    """ iterencode yields the JSON text of a GeoJSON object as it is
+        serialized, with only the coordinates of geometries quantized.
+        Properties and other members are left as json encodes them.
+
+    Args:
+        obj: GeoJSON FeatureCollection, Feature or geometry (dict)
+        precision (optional): decimal places of coordinates e.g. 4
+            (None to leave unchanged)
+        separators (optional): (item, key) separators e.g. (',', ':')
+        ensure_ascii (optional): boolean escape non-ASCII characters
+            (False as geojson.dumps)
+
+    Returns:
+        generator of strings
+    """
+    encoder = json.JSONEncoder(separators=separators, ensure_ascii=ensure_ascii)
+    item, key = separators
+    def coordinates(c):
+        """ coordinates returns the JSON text of (nested) coordinates.
+        """
+        if isinstance(c, (list, tuple)):
+            return '[' + item.join(map(coordinates, c)) + ']'
+        if precision is not None and isinstance(c, float) and math.isfinite(c):
+            return repr(round(c, precision))
+        return encoder.encode(c)
+    def members(obj):
+        """ members yields the JSON text of an object, descending only
+            through FeatureCollection, Feature and geometry members.
+        """
+        if not isinstance(obj, dict):
+            yield encoder.encode(obj)
+            return
+        obj_type = obj.get('type')
+        yield '{'
+        for i, (k, v) in enumerate(obj.items()):
+            yield (item if i else '') + encoder.encode(k) + key
+            if ((k == 'features' and obj_type == 'FeatureCollection') or
+                (k == 'geometries' and obj_type == 'GeometryCollection')):
+                yield '['
+                for j, member in enumerate(v):
+                    if j:
+                        yield item
+                    yield from members(member)
+                yield ']'
+            elif k == 'geometry' and obj_type == 'Feature':
+                yield from members(v)
+            elif k == 'coordinates' and obj_type in GEOMETRIES:
+                yield coordinates(v)
+            else:
+                yield encoder.encode(v)
+        yield '}'
+    return members(obj)
+
+def dumps(obj, precision=PRECISION, separators=(', ', ': '), ensure_ascii=True):
+    """ dumps returns the JSON text of a GeoJSON object (see iterencode).
+    """
+    return ''.join(iterencode(obj, precision, separators, ensure_ascii))
+
+def dump(obj, f, precision=PRECISION, separators=(', ', ': '), ensure_ascii=True):
+    """ dump writes the JSON text of a GeoJSON object to a file as it is
+        serialized (see iterencode).
+    """
+    for chunk in iterencode(obj, precision, separators, ensure_ascii):
+        f.write(chunk)
+
+def compressions():
+    """ compressions returns the extensions of the compressed siblings
+        written by output e.g. ('.gz', '.br') ('.br' if brotli is installed).
+    """
+    return ('.gz', '.br') if brotli is not None else ('.gz',)
+
+@contextmanager
+def output(f_out, compress=False):
+    """ output opens a UTF-8 text file for writing and, if compress, streams
+        precompressed siblings of it in the same pass e.g. "suas.geojson.gz"
+        and "suas.geojson.br" for static hosting. Each sibling is compressed
+        in its own thread, as the text is encoded. Each file is written to a
+        ".tmp" name and replaces its output only once all are written, so no
+        partial output is left if writing fails (e.g. for ccx.py to mistake
+        as complete). Siblings left by an earlier run are removed when not
+        compressing (so none is stale).
+
+    Args:
+        f_out: full path to output file e.g. "C:\\ccx\\suas.geojson"
+        compress (optional): boolean also write compressions()
+
+    Yields:
+        text file
+    """
+    extensions = compressions() if compress else ()
+    plain = open(f_out + '.tmp', 'wb')
+    workers = []
+    for ext in extensions:
+        worker = {'f_out': f_out + ext, 'queue': queue.Queue(maxsize=64),
+                  'error': None}
+        worker['thread'] = threading.Thread(target=compressor, args=(worker,),
+                                            daemon=True)
+        worker['thread'].start()
+        workers.append(worker)
+    raw = Tee(plain, [worker['queue'] for worker in workers])
+    f = io.TextIOWrapper(io.BufferedWriter(raw, BUFFER), encoding='utf-8',
+                         newline='')
+    error = None
+    try:
+        yield f
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        try:
+            f.close()
+        except BaseException as e:
+            error = error or e
+        for worker in workers:
+            worker['queue'].put(None)
+        for worker in workers:
+            worker['thread'].join()
+            error = error or worker['error']
+        if error:
+            for f_tmp in [f_out] + [worker['f_out'] for worker in workers]:
+                if os.path.exists(f_tmp + '.tmp'):
+                    os.remove(f_tmp + '.tmp')
+    if error:
+        raise error
+    for worker in workers:
+        os.replace(worker['f_out'] + '.tmp', worker['f_out'])
+    for ext in ('.gz', '.br'):
+        if ext not in extensions and os.path.exists(f_out + ext):
+            os.remove(f_out + ext)
+    os.replace(f_out + '.tmp', f_out)
+
+def compressor(worker):
+    """ compressor writes the chunks queued for a compressed sibling (gzip or
+        brotli by extension) to its ".tmp" name until None, recording any
+        error.
+    """
+    try:
+        with open(worker['f_out'] + '.tmp', 'wb') as f:
+            if worker['f_out'].endswith('.br'):
+                c = brotli.Compressor(quality=BROTLI_QUALITY)
+                for chunk in iter(worker['queue'].get, None):
+                    f.write(c.process(chunk))
+                f.write(c.finish())
+            else:
+                # mtime 0 so unchanged outputs compress to identical bytes
+                with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=GZIP_LEVEL,
+                                   mtime=0) as gz:
+                    for chunk in iter(worker['queue'].get, None):
+                        gz.write(chunk)
+    except Exception as e:
+        worker['error'] = worker['error'] or e
+        for chunk in iter(worker['queue'].get, None):
+            pass # drain so the writer is never blocked
+
+class Tee(io.RawIOBase):
+    """ Tee is a binary stream writing to a file and queueing each chunk for
+        the compressors (see output).
+    """
+    def __init__(self, f, queues):
+        self.f = f
+        self.queues = queues
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.f.write(b)
+        chunk = bytes(b)
+        for q in self.queues:
+            q.put(chunk)
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self.f.close()
+        super().close()
@@ -1,17 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2020.1.30'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
-import csv
+import dafif
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
 import re
 import math
-import geojson
+import geoencode
 from collections import OrderedDict
 
+TABLES = ['ARPT', 'RWY', 'TRM_MIN'] # DAFIF tables read (dafif.py)
 
 def main():
     """ iap.py parses the NGA's DAFIF for IAP minima.
@@ -33,13 +34,20 @@ def main():
                         help='minimum runway width (ft) (int)')
     parser.add_argument('-t', metavar = 'TYPE', default= '',
                         help='filter for IAP type (e.g. \'T\' for TACAN) [just the letter]')
+    parser.add_argument('-m', metavar = ('FILE', 'LENGTH', 'WIDTH', 'TYPE'), nargs = 4,
+                        action = 'append', default = [],
+                        help = 'additional output with its own filters (\'\' for any type), repeatable '
+                        '(e.g. -m tacan.geojson 6000 100 T)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d = args.d
     f_out = args.f
     filter_rwy_len = args.l
     filter_rwy_wid = args.w
     filter_trm_type = args.t
-    if len(d) < 1 or len(f_out) < 1:
+    outputs = [(f, int(l), int(w), t) for f, l, w, t in args.m]
+    if len(d) < 1 or (len(f_out) < 1 and not outputs):
         # Identify files
         # http://stackoverflow.com/a/3579625
         Tk().withdraw()  # we don't want a full GUI so hide the root window
@@ -78,188 +86,138 @@ def main():
                 except:
                     filter_trm_type = ''
     if len(d) > 0 and len(f_out) > 0:
-        # Parse ARPT.txt
-        f_rwy = d + '\\ARPT\\RWY.txt'
-        f_trm = d + '\\TRM\\TRM_MIN.txt'
-        f_arpt = d + '\\ARPT\\ARPT.txt'
-        arpt_ident = {}
-        arpt_name = {}
-        arpt_dlat = {}
-        arpt_dlon = {}
-        with open(f_arpt, 'r') as f:
-            arpt_raw = csv.reader(f, delimiter='\t')
-            # This skips the first row of the CSV file.
-            next(arpt_raw)
-            for row in arpt_raw:
-                arpt_ident[row[0]] = (row[3] if len(row[3]) > len(row[4])
-                                      else row[4])
-                arpt_name[row[0]] = row[1]
-                arpt_dlat[row[0]] = row[8]
-                arpt_dlon[row[0]] = row[10]
-        # Parse RWY.txt
-        rwy_arpt_raw = []
-        rwy_rwy_raw = []
-        rwy_len_raw = []
-        rwy_wid_raw = []
-        with open(f_rwy, 'r') as f:
-            rwy_raw = csv.reader(f, delimiter='\t')
-            next(rwy_raw)
-            for row in rwy_raw:
-                rwy_arpt_raw.append(row[0])
-                rwy_rwy_raw.append(row[1])
-                rwy_len_raw.append(int(row[5]))
-                rwy_wid_raw.append(int(row[6]))
-                rwy_arpt_raw.append(row[0])
-                rwy_rwy_raw.append(row[2])
-                rwy_len_raw.append(int(row[5]))
-                rwy_wid_raw.append(int(row[6]))
-        rwy_arpt_filter = []
-        rwy_rwy_filter = []
-        rwy_len_filter = []
-        rwy_wid_filter = []
-        for i, a in enumerate(rwy_arpt_raw):
-            if (rwy_len_raw[i] >= filter_rwy_len
-                and rwy_wid_raw[i] >= filter_rwy_wid):
-                rwy_arpt_filter.append(a)
-                rwy_rwy_filter.append(rwy_rwy_raw[i])
-                rwy_len_filter.append(rwy_len_raw[i])
-                rwy_wid_filter.append(rwy_wid_raw[i])
-        rwy_arpt_raw = rwy_arpt_filter
-        rwy_rwy_raw = rwy_rwy_filter
-        rwy_len_raw = rwy_len_filter
-        rwy_wid_raw = rwy_wid_filter
-        # Parse TRM_MIN.txt
-        circling = '&copy;'
-        trm_arpt_raw = []
-        trm_ident_raw = []
-        trm_catcdh_raw = []
-        trm_catcha_raw = []
-        trm_catcwc_raw = []
-        trm_catcwv_raw = []
-        with open(f_trm, 'r') as f:
-            trm_raw = csv.reader(f, delimiter='\t')
-            next(trm_raw)
-            for row in trm_raw:
-                trm_arpt_raw.append(row[0])
-                trm_ident_raw.append(row[2])
-                trm_catcdh_raw.append(row[15])
-                trm_catcha_raw.append(row[17])
-                trm_catcwc_raw.append(row[18])
-                trm_catcwv_raw.append(row[19])
-        # Filter IAP
-        trm_arpt_filter = []
-        trm_ident_filter = []
-        trm_catcdh_filter = []
-        trm_catcha_filter = []
-        trm_catcwc_filter = []
-        trm_catcwv_filter = []
-        for i, a in enumerate(trm_arpt_raw):
-            if (filter_trm_type in trm_ident_raw[i][0]
-                    and 'COPTER' not in trm_ident_raw[i]
-                    and a in rwy_arpt_raw):
-                trm_arpt_filter.append(a)
-                trm_ident_filter.append(trm_ident_raw[i])
-                trm_catcdh_filter.append(trm_catcdh_raw[i])
-                trm_catcha_filter.append(trm_catcha_raw[i])
-                trm_catcwc_filter.append(trm_catcwc_raw[i])
-                trm_catcwv_filter.append(trm_catcwv_raw[i])
-        trm_arpt_raw = trm_arpt_filter
-        trm_ident_raw = trm_ident_filter
-        trm_catcdh_raw = trm_catcdh_filter
-        trm_catcha_raw = trm_catcha_filter
-        trm_catcwc_raw = trm_catcwc_filter
-        trm_catcwv_raw = trm_catcwv_filter
-        # Get indices of first instances of ARPT in RWY
-        i_rwy = []
-        for a in rwy_arpt_raw:
-            i_rwy.append(rwy_arpt_raw.index(a))
-        i_rwy = list(set(i_rwy))
-        i_rwy.sort()
-        i_rwy.append(len(rwy_arpt_raw) + 1)
-        # Get indices of first instances of ARPT in TRM
-        i_trm = []
-        for a in trm_arpt_raw:
-            i_trm.append(trm_arpt_raw.index(a))
-        i_trm = list(set(i_trm))
-        i_trm.sort()
-        i_trm.append(len(trm_arpt_raw) + 1)
-        # Create final lists corresponding to ARPT
-        trm_arpt = []
-        trm_rwy = []
-        trm_iap = []
-        for j_trm, k in enumerate(i_trm[:-1]):
-            j_rwy = i_rwy.index(rwy_arpt_raw.index(trm_arpt_raw[k]))
-            rwy_arpt = rwy_arpt_raw[i_rwy[j_rwy]:i_rwy[j_rwy+1]]
-            rwy_rwy = rwy_rwy_raw[i_rwy[j_rwy]:i_rwy[j_rwy+1]]
-            rwy_len = rwy_len_raw[i_rwy[j_rwy]:i_rwy[j_rwy+1]]
-            rwy_wid = rwy_wid_raw[i_rwy[j_rwy]:i_rwy[j_rwy+1]]
-            trm_ident = trm_ident_raw[i_trm[j_trm]:i_trm[j_trm+1]]
-            trm_catcdh = trm_catcdh_raw[i_trm[j_trm]:i_trm[j_trm+1]]
-            trm_catcha = trm_catcha_raw[i_trm[j_trm]:i_trm[j_trm+1]]
-            trm_catcwc = trm_catcwc_raw[i_trm[j_trm]:i_trm[j_trm+1]]
-            trm_catcwv = trm_catcwv_raw[i_trm[j_trm]:i_trm[j_trm+1]]
+        outputs.insert(0, (f_out, filter_rwy_len, filter_rwy_wid, filter_trm_type))
+    if len(d) > 0 and outputs:
+        variants(d, outputs, compress=args.z)
+
+def build(d, f_out, filter_rwy_len=0, filter_rwy_wid=0, filter_trm_type='',
+          conn=None, arpt_rows=None, compress=False):
+    """ build writes the IAP with lowest HAT per airport to GeoJSON.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        f_out: full path to output file (*.geojson, *.json)
+        filter_rwy_len (optional): minimum runway length (ft) e.g. 6000
+        filter_rwy_wid (optional): minimum runway width (ft) e.g. 100
+        filter_trm_type (optional): IAP type letter e.g. 'T' for TACAN
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        arpt_rows (optional): shared ARPT rows e.g. from ccx.py
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    variants(d, [(f_out, filter_rwy_len, filter_rwy_wid, filter_trm_type)],
+             conn=conn, arpt_rows=arpt_rows, compress=compress)
+
+def variants(d, outputs, conn=None, arpt_rows=None, compress=False):
+    """ variants writes the IAP with lowest HAT per airport to several
+        GeoJSON outputs (profiles), each with its own filters, from one
+        pass over the tables.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        outputs: list of (f_out, filter_rwy_len, filter_rwy_wid,
+            filter_trm_type) e.g. [('tacan.geojson', 6000, 100, 'T'),
+                                   ('iap.geojson', 8000, 150, '')]
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        arpt_rows (optional): shared ARPT rows e.g. from ccx.py
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    close = conn is None
+    if close:
+        conn = dafif.connect(d, tables=TABLES)
+    # Query ARPT (only airports with IAP) unless shared
+    if arpt_rows is None:
+        arpt_rows = conn.execute('SELECT * FROM ARPT WHERE ARPT_IDENT IN '
+                                 '(SELECT ARPT_IDENT FROM TRM_MIN)')
+    arpt_ident = {}
+    arpt_name = {}
+    arpt_dlat = {}
+    arpt_dlon = {}
+    for row in arpt_rows:
+        arpt_ident[row[0]] = (row[3] if len(row[3]) > len(row[4])
+                              else row[4])
+        arpt_name[row[0]] = row[1]
+        arpt_dlat[row[0]] = row[8]
+        arpt_dlon[row[0]] = row[10]
+    # Query RWY (least length and width of any profile filtered in SQL),
+    # grouped by ARPT_IDENT with both ends of each runway
+    rwys = {} # ARPT_IDENT: [(RWY_IDENT, length, width), ...]
+    title = dafif.columns(conn, 'RWY')
+    for row in conn.execute(
+            'SELECT * FROM RWY WHERE CAST("{}" AS INTEGER) >= ? AND '
+            'CAST("{}" AS INTEGER) >= ? ORDER BY rowid'.format(title[5], title[6]),
+            (min(o[1] for o in outputs), min(o[2] for o in outputs))):
+        rwy = rwys.setdefault(row[0], [])
+        rwy.append((row[1], int(row[5]), int(row[6])))
+        rwy.append((row[2], int(row[5]), int(row[6])))
+    # Query TRM_MIN (IAP types of every profile filtered in SQL), grouped by
+    # ARPT_IDENT for airports with a runway in RWY
+    circling = '&copy;'
+    trms = OrderedDict() # ARPT_IDENT: [(row order, IDENT, IDENT_RWY, CAT C HA, IAP), ...]
+    title = dafif.columns(conn, 'TRM_MIN')
+    where, params = '', []
+    types = set(o[3] for o in outputs)
+    if all(len(t) == 1 for t in types):
+        where, params = dafif.glob(title[2], sorted(types))
+        where = ' WHERE ' + where
+    for i, row in enumerate(conn.execute('SELECT * FROM TRM_MIN' + where +
+                                         ' ORDER BY rowid', params)):
+        if (any(t in row[2][0] for t in types)
+                and 'COPTER' not in row[2]
+                and row[0] in rwys):
             # Get IDENT_RWY and IDENT_TRM from IDENT
-            trm_ident_rwy = []
-            trm_ident_trm = []
-            for b, a in enumerate(trm_ident):
-                try:
-                    trm_ident_rwy.append(re.search('[0-9]{2}[LRC]?', a).group(0))
-                except:
-                    # https://xkcd.com/1171/
-                    trm_ident_rwy.append(circling)
-                trm_ident_trm.append(a.split(' ', maxsplit = 1)[1]
-                                     .replace('RW','RWY ').strip())
-            # Get index list of IAP with lowest HAT
-            ii_trm = sorted(range(len(trm_catcha)), key=lambda x:trm_catcha[x])
-            rwy = ''
-            iii = 0
-            while rwy == '' and iii < len(ii_trm):
-                if ((trm_ident_rwy[ii_trm[iii]] == circling
-                        or trm_ident_rwy[ii_trm[iii]] in rwy_rwy)
-                        and trm_catcha[ii_trm[iii]] != ''):
-                    if trm_ident_rwy[ii_trm[iii]] == circling:
-                        r = rwy_len.index(max(rwy_len))
-                        c = circling + ' '
-                    else:
-                        r = rwy_rwy.index(trm_ident_rwy[ii_trm[iii]])
-                        c = ''
-                    trm_arpt.append(trm_arpt_raw[k])
-                    rwy = (c + str(rwy_rwy[r]) + ' (' + str(rwy_len[r]) +
-                               '&prime;&times;' + str(rwy_wid[r]) + '&prime;)')
-                    trm_rwy.append(rwy)
-                    
-                    iap = (str(trm_ident_trm[ii_trm[iii]]) +
-                           ': <span class=\'details\' title=\'Class C\'>' +
-                           str(trm_catcdh[ii_trm[iii]]) + '&prime; [' +
-                           str(trm_catcha[ii_trm[iii]]) + '&prime;] (' +
-                           str(trm_catcwc[ii_trm[iii]].lstrip('0')) + '/' +
-                           str(trm_catcwv[ii_trm[iii]]) + ')' + '</span>')
-                    trm_iap.append(iap)
+            try:
+                ident_rwy = re.search('[0-9]{2}[LRC]?', row[2]).group(0)
+            except:
+                # https://xkcd.com/1171/
+                ident_rwy = circling
+            trms.setdefault(row[0], []).append((i, row[2], ident_rwy, row[17], row))
+    if close:
+        conn.close()
+    # Lowest HAT first (stable, so a profile's subset keeps the same order)
+    for trm in trms.values():
+        trm.sort(key=lambda t: t[3])
+    for f_out, filter_rwy_len, filter_rwy_wid, filter_trm_type in outputs:
+        # Select the IAP with lowest HAT per airport (to a runway or circling)
+        selected = []
+        for a, trm in trms.items():
+            rwy = [r for r in rwys[a]
+                   if r[1] >= filter_rwy_len and r[2] >= filter_rwy_wid]
+            trm = [t for t in trm if filter_trm_type in t[1][0]]
+            if not rwy or not trm:
+                continue
+            rwy_rwy = [r[0] for r in rwy]
+            for i, ident, ident_rwy, catcha, row in trm:
+                if ((ident_rwy != circling and ident_rwy not in rwy_rwy)
+                        or catcha == ''):
+                    continue
+                if ident_rwy == circling:
+                    r = max(rwy, key=lambda r: r[1]) # first longest
+                    c = circling + ' '
                 else:
-                    iii = iii + 1
-        # Write CSV
-    ##    with open(f_out, 'w', newline='', encoding='utf-8') as f:
-    ##        wr = csv.writer(f, dialect=csv.excel, delimiter=',')
-    ##        # Excel chucks a wobbly if the first two characters are "ID",
-    ##        # hence "ICAO" instead of "IDENT"
-    ##        wr.writerow(['ICAO', 'NAME', 'IAP', 'RWY', 'dlat', 'dlon'])
-    ##        for i, a in enumerate(trm_arpt):
-    ##            wr.writerow([arpt_ident[a], arpt_name[a],
-    ##                         trm_iap[i], trm_rwy[i], 
-    ##                         arpt_dlat[a], arpt_dlon[a]])
+                    r = rwy[rwy_rwy.index(ident_rwy)]
+                    c = ''
+                # Airports in order of their first IAP of this profile
+                selected.append((min(t[0] for t in trm), a, r, c, row))
+                break
         fc = []
-        for i, a in enumerate(trm_arpt):
+        for i, a, r, c, row in sorted(selected, key=lambda s: s[0]):
+            ident_trm = row[2].split(' ', maxsplit = 1)[1].replace('RW','RWY ').strip()
             d = OrderedDict()
             d['IDENT'] = arpt_ident[a]
             d['NAME'] = arpt_name[a]
-            d['IAP'] = trm_iap[i]
-            d['RWY'] = trm_rwy[i]
+            d['IAP'] = (str(ident_trm) +
+                        ': <span class=\'details\' title=\'Class C\'>' +
+                        str(row[15]) + '&prime; [' +
+                        str(row[17]) + '&prime;] (' +
+                        str(row[18].lstrip('0')) + '/' +
+                        str(row[19]) + ')' + '</span>')
+            d['RWY'] = (c + str(r[0]) + ' (' + str(r[1]) +
+                        '&prime;&times;' + str(r[2]) + '&prime;)')
             # (Lon, Lat) because https://github.com/frewsxcv/python-geojson#point)
-            p = geojson.Point((float(arpt_dlon[a]), float(arpt_dlat[a])))
-            fc.append(geojson.Feature(geometry=p, properties=d))
-        with open(f_out, 'w', newline='', encoding='utf-8') as f:
-            f.write(geojson.dumps(geojson.FeatureCollection(fc)))
-
+            p = geoencode.geometry('Point', (float(arpt_dlon[a]), float(arpt_dlat[a])))
+            fc.append(geoencode.feature(p, d))
+        with geoencode.output(f_out, compress) as f:
+            geoencode.dump(geoencode.feature_collection(fc), f, ensure_ascii=False)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+from tkinter import Tk
+from tkinter.filedialog import askdirectory
+from bs4 import BeautifulSoup  # used to parse html
+import fuel
+import os
+import re
+import time
+
+REPEAT = 5 # passes over the pages timed (the best is reported)
+
+
+def main():
+    """ merchant-bench.py checks the merchant table extractor of fuel.py
+        (fuel.merchant_rows) against the BeautifulSoup extraction it
+        replaced on pages recorded by fuel.py (-r), and times both.
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Compares and times the AIR Card merchant table extractors.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-d', metavar = 'PATH', default = '',
+                        help = 'full path to directory of recorded responses (fuel.py -r)')
+    parser.add_argument('-n', metavar = 'REPEAT', default = REPEAT, type=int,
+                        help = 'passes over the pages timed (int)')
+    args = parser.parse_args()
+    d = args.d
+    if len(d) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        d = askdirectory(title='Select the folder of recorded responses')
+    if len(d) > 0:
+        result = bench(d, args.n)
+        print(str(result['pages']) + ' pages, ' + str(result['rows']) + ' rows: ' +
+              ('identical' if not result['mismatches'] else
+               'MISMATCH ' + ', '.join(result['mismatches'])))
+        for extractor in ('soup', 'stream'):
+            print(extractor.ljust(7) + '%8.1f ms' % (result[extractor] * 1000))
+        if result['stream'] > 0:
+            print('speedup %8.1fx' % (result['soup'] / result['stream']))
+
+def bench(d, repeat=REPEAT):
+    """ bench extracts the merchant rows of every recorded page with both
+        extractors, comparing their rows (or the exception raised), and
+        times a pass over all pages with each.
+
+    Args:
+        d: full path to directory of recorded responses (fuel.py -r)
+        repeat (optional): passes timed e.g. 5
+
+    Returns:
+        dict of pages, rows, mismatches (file names) and best pass (s) of
+        'soup' and 'stream'
+    """
+    pages = {}
+    for name in sorted(os.listdir(d)):
+        if name.endswith('.html'):
+            with open(os.path.join(d, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages[name] = f.read()
+    result = {'pages': len(pages), 'rows': 0, 'mismatches': []}
+    for name, page in pages.items():
+        expected = extract(soup_rows, page)
+        if extract(stream_rows, page) != expected:
+            result['mismatches'].append(name)
+        elif isinstance(expected, list):
+            result['rows'] += len(expected)
+    for extractor, rows in (('soup', soup_rows), ('stream', stream_rows)):
+        best = None
+        for i in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            for page in pages.values():
+                extract(rows, page)
+            t = time.perf_counter() - t0
+            best = t if best is None else min(best, t)
+        result[extractor] = best
+    return result
+
+def extract(rows, page):
+    """ extract returns the rows of a page, or the type of exception raised.
+    """
+    try:
+        return rows(page, 'XX')
+    except Exception as e:
+        return type(e)
+
+def stream_rows(page, region):
+    """ stream_rows extracts the rows of a whole page as fuel.http_region.
+    """
+    return fuel.merchant_rows(page, region, 'map_merchant_details')
+
+def soup_rows(page, region):
+    """ soup_rows extracts the rows of a whole page as fuel.http_region did
+        before fuel.merchant_rows streamed them (the reference), raising as
+        fuel.merchant_rows for a page without merchant details.
+    """
+    details = BeautifulSoup(page, 'html.parser').find(id='map_merchant_details')
+    if details is None or 'Merchant Name' not in details.text:
+        raise ValueError('no merchant details (map_merchant_details) for ' + region)
+    soup = BeautifulSoup(str(details), 'html.parser')
+    rows = []
+    for subtable in soup.find_all('table', {'id' : re.compile('C_ROW')}):
+        for row in subtable.find_all('tr', class_=True):
+            col = row.find_all('td')
+            rows.append((region, col[1].text.strip(), col[2].text.strip(),
+                         col[5].text.strip(), col[0].text.strip(),
+                         col[10].text.strip(), col[11].text.strip()))
+    return rows
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,20 @@
 #!/usr/bin/env python
 
-__version__ = '2020.1.30'
+__version__ = '2026.10.18'
 
-from json import load, JSONEncoder
+from json import JSONDecoder, JSONDecodeError
 import argparse
-from re import compile
+import geoencode
 from tkinter import Tk
 from tkinter.filedialog import askopenfilenames, asksaveasfilename
 import sys
 
+CHUNK = 1 << 16 # characters read at a time
+
 def main():
     """ merge-geojson.py merges multiple GeoJSON files.
         Forked from https://gist.github.com/themiurgo/8687883.js
     """
-    float_pat = compile(r'^-?\d+\.\d+(e-?\d+)?$')
-    charfloat_pat = compile(r'^[\[,\,]-?\d+\.\d+(e-?\d+)?$')
     parser = argparse.ArgumentParser(
         description= 'Merge multiple GeoJSON files.',
         epilog = 'Lack of path arguments will invoke GUI elements.')
@@ -24,7 +24,9 @@ def main():
     parser.add_argument('-o', metavar = 'OUTFILE', default = '',
                       help='full path of output file (*.geojson, *.json)')
     parser.add_argument('-p', metavar = 'PRECISION', type=int, default = 6, 
-                      help='digits of precision (int)')
+                      help='decimal places of coordinates (int)')
+    parser.add_argument('-z', action = 'store_true',
+                      help='also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     infiles = list(args.i)
     outfile = args.o
@@ -41,35 +43,111 @@ def main():
                                         filetypes=[('GeoJSON', '*.geojson'),('JSON', '*.json')],
                                         defaultextension='.geojson')
     if len(infiles) > 0 and len(outfile) > 0:
-        outjson = dict(type='FeatureCollection', features=[])
+        merge(infiles, outfile, p, args.z)
+
+def merge(infiles, outfile, p=6, compress=False):
+    """ merge writes the features of multiple GeoJSON files to one,
+        streaming one feature at a time (see features).
+
+    Args:
+        infiles: full paths of files to be merged (*.geojson, *.json)
+        outfile: full path of output file (*.geojson, *.json)
+        p (optional): decimal places of coordinates e.g. 6 (geoencode.py)
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    with geoencode.output(outfile, compress) as f:
+        f.write('{"type":"FeatureCollection","features":[')
+        separator = ''
         for infile in infiles:
-            with open(infile, 'r') as f:
-                injson = load(f)
-            if injson.get('type', None) != 'FeatureCollection':
-                raise Exception('Sorry, "%s" does not look like GeoJSON' % infile)
-            if type(injson.get('features', None)) != list:
-                raise Exception('Sorry, "%s" does not look like GeoJSON' % infile)
-            try:    
-                outjson['features'] += injson['features']
-            except:
-                outjson['features'] += injson
-        encoder = JSONEncoder(separators=(',', ':'))
-        encoded = encoder.iterencode(outjson)
-        format = '%.' + str(p) + 'f'
-        output = outfile
-        with open(output, 'w', newline='', encoding='utf-8') as f:
-            for token in encoded:
-                if charfloat_pat.match(token):
-                    # in python 2.7, we see a character followed by a float literal
-                    f.write(token[0] + format % float(token[1:]))
+            for feature in features(infile):
+                f.write(separator)
+                separator = ','
+                geoencode.dump(feature, f, precision=p, separators=(',', ':'))
+        f.write(']}')
 
-                elif float_pat.match(token):
-                    # in python 2.6, we see a simple float literal
-                    f.write(format % float(token))
+def features(infile):
+    """ features yields the features of a GeoJSON FeatureCollection one at a
+        time, holding no more of the file than the feature being decoded.
 
-                else:
-                    f.write(token)
+    Args:
+        infile: full path of file (*.geojson, *.json)
 
+    Returns:
+        generator of feature dicts
+    """
+    error = 'Sorry, "%s" does not look like GeoJSON' % infile
+    decoder = JSONDecoder()
+    with open(infile, 'r') as f:
+        buf = ''
+        pos = 0
+        def more():
+            """ more appends to the unread buffer (doubling for large values)
+                and returns False at end of file.
+            """
+            nonlocal buf, pos
+            chunk = f.read(max(CHUNK, len(buf) - pos))
+            buf = buf[pos:] + chunk
+            pos = 0
+            return len(chunk) > 0
+        def skip():
+            """ skip returns the next character after whitespace.
+            """
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\n\r':
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not more():
+                    raise Exception(error)
+        def value():
+            """ value returns the next JSON value, reading until it (and the
+                character after it) are in the buffer.
+            """
+            nonlocal pos
+            skip()
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except JSONDecodeError:
+                    if not more():
+                        raise
+                    continue
+                if end < len(buf) or not more():
+                    pos = end
+                    return obj
+        if skip() != '{':
+            raise Exception(error)
+        pos += 1
+        collection = None
+        found = False
+        while skip() != '}':
+            if buf[pos] == ',':
+                pos += 1
+                continue
+            key = value()
+            if skip() != ':':
+                raise Exception(error)
+            pos += 1
+            if key == 'features':
+                if skip() != '[':
+                    raise Exception(error)
+                pos += 1
+                found = True
+                while skip() != ']':
+                    if buf[pos] == ',':
+                        pos += 1
+                        continue
+                    yield value()
+                pos += 1
+            else:
+                v = value()
+                if key == 'type':
+                    collection = v
+                    if collection != 'FeatureCollection':
+                        raise Exception(error)
+        if collection != 'FeatureCollection' or not found:
+            raise Exception(error)
 
 if __name__ == "__main__":
     main()
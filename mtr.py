@@ -1,14 +1,19 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2020.1.30'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
-import csv, json
-from geojson import Feature, FeatureCollection, LineString
+from collections import OrderedDict
+import dafif
+import geodesy
+import geoencode
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
 
+TABLES = ['MTR_OV'] # DAFIF tables read (dafif.py)
+PRECISION = 4 # decimal places of coordinates written
+
 def main():
     """ mtr.py parses the NGA's DAFIF for Military Training Routes.
         Downloads at https://dbgia.geointel.nga.mil/
@@ -23,9 +28,16 @@ def main():
                         help = 'full path to "DAFIFT" directory')
     parser.add_argument('-f', metavar = 'FILE', default = '',
                         help = 'full path to output file (*.geojson, *.json)')
+    parser.add_argument('-l', metavar = 'FILE', default = '',
+                        help = 'full path to label output file (*.geojson, *.json) written in the same pass')
+    parser.add_argument('-s', metavar = 'TOLERANCE', default = 0, type=float,
+                        help = 'simplify routes to within tolerance (NM) (e.g. 0.1)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d = args.d
     f_out = args.f
+    f_label = args.l
     if len(d) < 1 or len(f_out) < 1:
         # Identify CSV
         # http://stackoverflow.com/a/3579625
@@ -36,38 +48,103 @@ def main():
                                   filetypes=[('GeoJSON', '*.geojson'),('JSON', '*.json')],
                                   defaultextension='.geojson')
     if len(d) > 0 and len(f_out) > 0:
-        # Read CSV
-        f_in = d + '\\MTR\\MTR_OV.txt'
-        with open(f_in) as csvfile:
-            csv_rows = []
-            featuresSegments = []
-            reader = csv.DictReader(csvfile, delimiter='\t')
-            # https://www.idiotinside.com/2015/09/18/csv-json-pretty-print-python/
-            title = reader.fieldnames
-            for row in reader:
-                #csv_rows.extend([{title[i]:row[title[i]] for i in range(len(title))}])
-                row_dict = ({title[i]:row[title[i]] for i in range(len(title))})
-                if row_dict['MTR_IDENT'][:2] == 'SR':
-                    continue
-                # https://stackoverflow.com/a/48586799
-                featuresSegments.append(
-                    Feature(
-                        geometry = LineString([
-                            (round(float(row_dict['PT_DLONG']), 4), round(float(row_dict['PT_DLAT']), 4)),
-                            (round(float(row_dict['NX_DLONG']), 4), round(float(row_dict['NX_DLAT']), 4))
-                            ]),
-                        properties = {
-                            'MTR': row_dict['MTR_IDENT'],
-                            'Type': row_dict['MTR_IDENT'][:2],
-                            'From': row_dict['PT_IDENT'],
-                            'To': row_dict['NX_POINT'],
-                        }
-                    )
+        outputs = [(f_out, 'routes')]
+        if len(f_label) > 0:
+            outputs.append((f_label, 'labels'))
+        variants(d, outputs, tolerance=args.s, compress=args.z)
+
+def build(d, f_out, conn=None, tolerance=0, compress=False):
+    """ build writes Military Training Routes to GeoJSON.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        f_out: full path to output file (*.geojson, *.json)
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        tolerance (optional): route simplification (NM) e.g. 0.1
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    variants(d, [(f_out, 'routes')], conn=conn, tolerance=tolerance,
+             compress=compress)
+
+def variants(d, outputs, conn=None, tolerance=0, compress=False):
+    """ variants writes Military Training Route layers to GeoJSON from one
+        pass over MTR_OV: routes (a LineString, or MultiLineString where
+        segments do not join, per MTR_IDENT) and labels (the first segment
+        of each route).
+
+    Args:
+        d: full path to "DAFIFT" directory
+        outputs: list of (f_out, layer) e.g.
+            [('mtr.geojson', 'routes'), ('mtr_label.geojson', 'labels')]
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        tolerance (optional): route simplification (NM) e.g. 0.1
+            (see geodesy.simplify)
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    # Query MTR_OV (SR excluded in SQL)
+    close = conn is None
+    if close:
+        conn = dafif.connect(d, tables=TABLES)
+    routes = OrderedDict() # MTR_IDENT: {'lines': [[(dlon, dlat), ...], ...], ...}
+    featuresLabels = []
+    mtr_ident = ''
+    for row_dict in conn.execute('SELECT * FROM MTR_OV WHERE MTR_IDENT '
+                                 'NOT GLOB \'SR*\' ORDER BY rowid'):
+        pt = (float(row_dict['PT_DLONG']), float(row_dict['PT_DLAT']))
+        nx = (float(row_dict['NX_DLONG']), float(row_dict['NX_DLAT']))
+        if row_dict['MTR_IDENT'] != mtr_ident:
+            mtr_ident = row_dict['MTR_IDENT']
+            featuresLabels.append(
+                geoencode.feature(
+                    geoencode.geometry('LineString', [pt, nx]),
+                    {
+                        'MTR': row_dict['MTR_IDENT'],
+                        'Type': row_dict['MTR_IDENT'][:2],
+                        'From': row_dict['PT_IDENT'],
+                        'To': row_dict['NX_POINT'],
+                    }
                 )
-            collection = FeatureCollection(featuresSegments)
-            with open(f_out, 'w', newline='', encoding='utf-8') as f:
-                #print(json.dumps(collection, sort_keys=False, indent=4, separators=(',', ': '),ensure_ascii=False))
-                f.write(json.dumps(collection))
+            )
+        route = routes.setdefault(mtr_ident, {'lines': [], 'From': row_dict['PT_IDENT']})
+        route['To'] = row_dict['NX_POINT']
+        # Join segments end to start, otherwise begin another line
+        if route['lines'] and route['lines'][-1][-1] == pt:
+            route['lines'][-1].append(nx)
+        else:
+            route['lines'].append([pt, nx])
+    if close:
+        conn.close()
+    featuresRoutes = []
+    vertices = [0, 0] # route vertices before and after simplification
+    for mtr_ident, route in routes.items():
+        vertices[0] += sum(len(line) for line in route['lines'])
+        route['lines'] = [geodesy.simplify(line, tolerance) for line in route['lines']]
+        vertices[1] += sum(len(line) for line in route['lines'])
+        if len(route['lines']) == 1:
+            geometry = geoencode.geometry('LineString', route['lines'][0])
+        else:
+            geometry = geoencode.geometry('MultiLineString', route['lines'])
+        featuresRoutes.append(
+            geoencode.feature(
+                geometry,
+                {
+                    'MTR': mtr_ident,
+                    'Type': mtr_ident[:2],
+                    'From': route['From'],
+                    'To': route['To'],
+                }
+            )
+        )
+    if tolerance > 0:
+        print('Routes: ' + str(vertices[0]) + ' vertices, ' +
+              str(vertices[1]) + ' simplified')
+    for f_out, layer in outputs:
+        if layer == 'labels':
+            collection = geoencode.feature_collection(featuresLabels)
+        else:
+            collection = geoencode.feature_collection(featuresRoutes)
+        with geoencode.output(f_out, compress) as f:
+            geoencode.dump(collection, f, precision=PRECISION)
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2023.1.13'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
-import csv, json
-from geojson import Feature, FeatureCollection, LineString
+import mtr
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
 
+TABLES = mtr.TABLES # DAFIF tables read (dafif.py)
+
 def main():
     """ mtr_label.py parses the NGA's DAFIF for Military Training Route labels.
         Downloads at https://dbgia.geointel.nga.mil/
@@ -23,6 +24,8 @@ def main():
                         help = 'full path to "DAFIFT" directory')
     parser.add_argument('-f', metavar = 'FILE', default = '',
                         help = 'full path to output file (*.geojson, *.json)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d = args.d
     f_out = args.f
@@ -36,42 +39,19 @@ def main():
                                   filetypes=[('GeoJSON', '*.geojson'),('JSON', '*.json')],
                                   defaultextension='.geojson')
     if len(d) > 0 and len(f_out) > 0:
-        # Read CSV
-        f_in = d + '\\MTR\\MTR_OV.txt'
-        with open(f_in) as csvfile:
-            csv_rows = []
-            mtr_ident = ''
-            featuresSegments = []
-            reader = csv.DictReader(csvfile, delimiter='\t')
-            # https://www.idiotinside.com/2015/09/18/csv-json-pretty-print-python/
-            title = reader.fieldnames
-            for row in reader:
-                #csv_rows.extend([{title[i]:row[title[i]] for i in range(len(title))}])
-                row_dict = ({title[i]:row[title[i]] for i in range(len(title))})
-                if row_dict['MTR_IDENT'][:2] == 'SR':
-                    continue
-                if row_dict['MTR_IDENT'] == mtr_ident:
-                    continue
-                mtr_ident = row_dict['MTR_IDENT']
-                # https://stackoverflow.com/a/48586799
-                featuresSegments.append(
-                    Feature(
-                        geometry = LineString([
-                            (round(float(row_dict['PT_DLONG']), 4), round(float(row_dict['PT_DLAT']), 4)),
-                            (round(float(row_dict['NX_DLONG']), 4), round(float(row_dict['NX_DLAT']), 4))
-                            ]),
-                        properties = {
-                            'MTR': row_dict['MTR_IDENT'],
-                            'Type': row_dict['MTR_IDENT'][:2],
-                            'From': row_dict['PT_IDENT'],
-                            'To': row_dict['NX_POINT'],
-                        }
-                    )
-                )
-            collection = FeatureCollection(featuresSegments)
-            with open(f_out, 'w', newline='', encoding='utf-8') as f:
-                #print(json.dumps(collection, sort_keys=False, indent=4, separators=(',', ': '),ensure_ascii=False))
-                f.write(json.dumps(collection))
+        build(d, f_out, compress=args.z)
+
+def build(d, f_out, conn=None, compress=False):
+    """ build writes Military Training Route labels to GeoJSON (see
+        mtr.variants).
+
+    Args:
+        d: full path to "DAFIFT" directory
+        f_out: full path to output file (*.geojson, *.json)
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    mtr.variants(d, [(f_out, 'labels')], conn=conn, compress=compress)
 
 if __name__ == "__main__":
     main()
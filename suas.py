@@ -1,21 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-__version__ = '2022.5.31'
+__version__ = '2026.10.18'
 
 import argparse  # process optional arguments
-import csv, json
-from geojson import Feature, FeatureCollection, Polygon
+import dafif
+import drx
+import geoencode
+import topo
 from tkinter import Tk
 from tkinter.filedialog import askdirectory, asksaveasfilename
-import math
-from xml.etree import ElementTree as et # append2drx
+import geodesy
+from itertools import groupby
+
+TABLES = ['SUAS', 'SUAS_CTRY'] # DAFIF tables read (dafif.py)
 
 def main():
     """ suas.py parses the NGA's DAFIF for Special Use Airspace.
         Downloads at https://dbgia.geointel.nga.mil/
     """
-    xml_handler = ('.drx', '.xml') # extensions for special consideration
     # INPUTS
     parser = argparse.ArgumentParser(
         description = 'Parses the NGA\'s DAFIF for Special Use Airspace.',
@@ -24,16 +27,26 @@ def main():
     parser.add_argument('-d', metavar = 'DAFIFT', default = '',
                         help = 'full path to "DAFIFT" directory')
     parser.add_argument('-f', metavar = 'file', default = '',
-                        help = 'full path to output file (*.geojson, *.json)')
+                        help = 'full path to output file (*.geojson, *.json, *.topojson, *.drx, *.xml)')
     parser.add_argument('-c', metavar = 'countries', default = '',
                         help='filter for acceptable countries (e.g. US JA)')
     parser.add_argument('-a', metavar = 'area', default= '90 -180 -90 180',
                         help='filter area by NW & SE corners if applicable (lat lng lat lng) (e.g. 50 -131 23 -66)')
+    parser.add_argument('-m', metavar = ('file', 'countries', 'area'), nargs = 3,
+                        action = 'append', default = [],
+                        help = 'additional output with its own filters (\'\' for none), repeatable '
+                        '(e.g. -m suas.drx "US" "50 -131 23 -66")')
+    parser.add_argument('-s', metavar = 'tolerance', default = 0, type=float,
+                        help = 'simplify boundaries to within tolerance (NM) (e.g. 0.1)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies of GeoJSON and TopoJSON (*.gz, and *.br if brotli is installed)')
     args = parser.parse_args()
     d = args.d
     f_out = args.f
     ctry_filter = args.c
     area_filter = list(map(float, args.a.split()))
+    outputs = [(f, c, list(map(float, a.split())) if a.strip() else
+                [90, -180, -90, 180]) for f, c, a in args.m]
     gui = False
     # http://stackoverflow.com/a/3579625
     Tk().withdraw() # we don't want a full GUI so hide the root window
@@ -41,10 +54,11 @@ def main():
         # show an "Open" dialog box and return the path to the selected file
         d = askdirectory(title='Select the folder "DAFIFT"')
         gui = True
-    if d and len(f_out) < 1:
+    if d and len(f_out) < 1 and not outputs:
         f_out = asksaveasfilename(title='Save As',
                                   filetypes=[('GeoJSON', '*.geojson'),
                                              ('JSON', '*.json'),
+                                             ('TopoJSON', '*.topojson'),
                                              ('Drawing Object', '*.drx'),
                                              ('XML', '*.xml')],
                                   defaultextension='.geojson')
@@ -69,33 +83,138 @@ def main():
         except:
             area_filter = list(map(float, '90 -180 -90 180'.split()))
     if d and f_out:
-        # Read CSV (CTRY)
-        f_in = d + '\\SUAS\\SUAS_CTRY.TXT'
-        ctry_dict = {}
-        with open(f_in) as csvfile:
-            reader = csv.DictReader(csvfile, delimiter='\t')
-            title = reader.fieldnames
-            for row in reader:
-                row_dict = ({title[i]:row[title[i]] for i in range(len(title))})
-                ctry_dict[row_dict['SUAS_IDENT']] = row_dict['CTRY_1']
-        # Read CSV (SUAS)
-        f_in = d + '\\SUAS\\SUAS.TXT'
-        with open(f_in) as csvfile:
-            featuresPolygons = []
-            drawing = et.Element('Objects') # Create SVG XML element
-            nm2ft = 6076.12
-            SUAS_IDENT = ''
-            coordinates = []
-            valid = False
-            reader = csv.DictReader(csvfile, delimiter='\t')
-            # https://www.idiotinside.com/2015/09/18/csv-json-pretty-print-python/
-            title = reader.fieldnames
-            for row in reader:
-                row_dict = ({title[i]:row[title[i]] for i in range(len(title))})
-                ctry_dict[row_dict['SUAS_IDENT']][:2]
-                if ctry_dict[row_dict['SUAS_IDENT']][:2] not in ctry_filter.upper().split() and ctry_filter != '':
+        outputs.insert(0, (f_out, ctry_filter, area_filter))
+    if d and outputs:
+        variants(d, outputs, tolerance=args.s, compress=args.z)
+        for name, info in geodesy.cache_info().items():
+            print('Geometry cache (' + name + '): ' + str(info.hits) + ' hits, ' +
+                  str(info.misses) + ' misses')
+
+def build(d, f_out, ctry_filter='', area_filter=[90, -180, -90, 180], conn=None,
+          tolerance=0, compress=False):
+    """ build writes Special Use Airspace to GeoJSON, TopoJSON (*.topojson)
+        or DRX (*.drx, *.xml).
+
+    Args:
+        d: full path to "DAFIFT" directory
+        f_out: full path to output file (*.geojson, *.json, *.topojson, *.drx,
+            *.xml)
+        ctry_filter (optional): string e.g. 'US JA'
+        area_filter (optional): NW & SE corners e.g. [50, -131, 23, -66]
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        tolerance (optional): boundary simplification (NM) e.g. 0.1
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+    """
+    variants(d, [(f_out, ctry_filter, area_filter)], conn=conn, tolerance=tolerance,
+             compress=compress)
+
+def variants(d, outputs, conn=None, tolerance=0, compress=False):
+    """ variants writes Special Use Airspace to several outputs from one
+        pass over SUAS, each feature routed to every output it matches.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        outputs: list of (f_out, ctry_filter, area_filter) e.g.
+            [('suas.geojson', 'US JA', [90, -180, -90, 180]),
+             ('suas.drx', '', [50, -131, 23, -66])]
+        conn (optional): shared sqlite3.Connection from dafif.connect
+        tolerance (optional): boundary simplification (NM) e.g. 0.1
+            (see topo.simplify), once every boundary is read so that those
+            shared by adjacent airspace stay shared (DRX is then written
+            at the end rather than streamed)
+        compress (optional): boolean also write *.gz (and *.br) of GeoJSON and
+            TopoJSON (see geoencode.output)
+    """
+    xml_handler = ('.drx', '.xml') # extensions for special consideration
+    close = conn is None
+    if close:
+        conn = dafif.connect(d, tables=TABLES)
+    specs = []
+    try:
+        for f_out, ctry_filter, area_filter in outputs:
+            specs.append({
+                'f_out': f_out,
+                'xml': f_out.endswith(xml_handler),
+                'ctry': ctry_filter.upper().split(),
+                'area': list(area_filter),
+                'features': [],
+                'vertices': [0, 0], # boundary vertices before and after simplification
+                'pending': [], # DRX objects held until simplified
+            })
+            if specs[-1]['xml']:
+                specs[-1]['drawing'] = drx.start(f_out) # written as it goes
+        # Country of the last SUAS_CTRY row of each SUAS_IDENT
+        ctry = {}
+        if any(spec['ctry'] for spec in specs):
+            for row in conn.execute('SELECT SUAS_IDENT, CTRY_1 FROM SUAS_CTRY '
+                                    'ORDER BY rowid'):
+                ctry[row['SUAS_IDENT']] = row['CTRY_1'][:2]
+        # Query SUAS rows matching any output (one group of rows per SUAS_IDENT)
+        where = []
+        params = []
+        for spec in specs:
+            clauses = []
+            if spec['ctry']:
+                clauses.append('SUAS_IDENT IN (SELECT SUAS_IDENT FROM SUAS_CTRY WHERE '
+                               'rowid IN (SELECT max(rowid) FROM SUAS_CTRY GROUP BY '
+                               'SUAS_IDENT) AND substr(CTRY_1, 1, 2) IN (' +
+                               ', '.join('?' * len(spec['ctry'])) + '))')
+                params.extend(spec['ctry'])
+            if spec['area'] != [90, -180, -90, 180]:
+                # SUAS_IDENT with any row intersecting the area (R*Tree)
+                clause, p = dafif.in_area('SUAS', spec['area'])
+                clauses.append('SUAS_IDENT IN (SELECT SUAS_IDENT FROM SUAS WHERE ' +
+                               clause + ')')
+                params.extend(p)
+            if not clauses:
+                where = []
+                params = []
+                break
+            where.append('(' + ' AND '.join(clauses) + ')')
+        nm2ft = 6076.12
+        rings = [] # boundaries to simplify together, each in a list [ring]
+        def append_xml(spec, coordinates, **kwargs):
+            """ append_xml draws a DRX object now, or once the boundaries are
+                simplified (coordinates in a list, a closed ring for lines).
+            """
+            if tolerance > 0:
+                spec['pending'].append((coordinates, kwargs))
+            else:
+                draw_xml(spec, coordinates, kwargs)
+        rows = conn.execute('SELECT * FROM SUAS' +
+                            (' WHERE ' + ' OR '.join(where) if where else '') +
+                            ' ORDER BY rowid', params)
+        for SUAS_IDENT, rows_ident in groupby(rows, key=lambda row: row['SUAS_IDENT']):
+            rows_ident = list(rows_ident)
+            # Route to outputs by country, rejecting airspace wholly outside each
+            # area before any geometry, and skipping per-vertex checks for
+            # airspace wholly inside
+            bbox = extent(rows_ident)
+            if bbox is None:
+                continue
+            matches = []
+            for spec in specs:
+                area_filter = spec['area']
+                if spec['ctry'] and ctry.get(SUAS_IDENT) not in spec['ctry']:
+                    continue
+                if (bbox[1] < area_filter[2] or bbox[0] > area_filter[0] or
+                    bbox[3] < area_filter[1] or bbox[2] > area_filter[3]):
                     continue
-                # append2drx color_pen_fore argument
+                spec['inside'] = (bbox[0] >= area_filter[2] and bbox[1] <= area_filter[0] and
+                                  bbox[2] >= area_filter[1] and bbox[3] <= area_filter[3])
+                matches.append(spec)
+            if not matches:
+                continue
+            geojson = any(not spec['xml'] for spec in matches)
+            # Geometry once per airspace: DRX draws circles as ellipses, so its
+            # boundary and the vertices checked against each area differ
+            coordinates = [] # GeoJSON boundary
+            checked = [] # GeoJSON vertices checked against the area
+            coordinates_xml = [] # DRX boundary
+            checked_xml = [] # DRX vertices checked against the area
+            ellipses = [] # DRX (centre, radii, color) of circles
+            for row_dict in rows_ident:
+                # drx.append color_pen_fore argument
                 if row_dict['TYPE'] == 'T' or row_dict['TYPE'] == 'R':
                     color_xml = [255, 0, 0] # red
                 elif row_dict['TYPE'] == 'M':
@@ -107,349 +226,160 @@ def main():
                 else:
                     color_xml = [0, 0, 0] # black
                     #color_xml = [0, 128, 0] # dark green
-                # Write completed geometry
-                if row_dict['SUAS_IDENT'] != SUAS_IDENT and len(coordinates) > 3:
-                    if coordinates[0] != coordinates[-1]:
-                        coordinates.append(coordinates[0])
-                    # https://stackoverflow.com/a/48586799
-                    if valid == True:
-                        featuresPolygons.append(
-                            Feature(
-                                geometry = Polygon([coordinates]),
-                                properties = properties
-                            )
-                        )
-                        coordinates.pop()
-                        drawing = append2drx(drawing, coordinates,
-                                             polygon=True,
-                                             color_pen_fore=color_xml,
-                                             tooltip=SUAS_IDENT)
-                    coordinates = []
-                    valid = False
-                # Abort invalid geometry
-                if row_dict['SUAS_IDENT'] != SUAS_IDENT and valid == False:
-                    coordinates = []
                 # Handle Circles
                 if row_dict['SHAP'] == 'C' or row_dict['SHAP'] == 'A':
-                    if f_out.endswith(xml_handler):
-                        point = (float(row_dict['WGS_DLONG0']), float(row_dict['WGS_DLAT0']))
-                        if (point[1] <= area_filter[0] and                            
-                            point[1] >= area_filter[2] and
-                            point[0] >= area_filter[1] and
-                            point[0] <= area_filter[3]):
-                            coordinates.append(point)
-                            drawing = append2drx(drawing, coordinates,
-                                                 obj = 'ellipse',
-                                                 vRadius = float(row_dict['RADIUS1']) * nm2ft,
-                                                 hRadius = float(row_dict['RADIUS1']) * nm2ft, 
-                                                 color_pen_fore=color_xml,
-                                                 tooltip=SUAS_IDENT)
-                            coordinates = []
-                            if row_dict['RADIUS2'] != '':
-                                coordinates.append(point)
-                                drawing = append2drx(drawing, coordinates,
-                                                     obj = 'ellipse',
-                                                     vRadius = float(row_dict['RADIUS2']) * nm2ft,
-                                                     hRadius = float(row_dict['RADIUS2']) * nm2ft, 
-                                                     color_pen_fore=color_xml,
-                                                     tooltip=SUAS_IDENT)
-                                coordinates = []
-                    else:
-                        n = 36
-                        circle = []
-                        for i in range(n):
-                            theta = 360 / n * i
-                            point = projection(
-                                float(row_dict['WGS_DLAT0']),
-                                float(row_dict['WGS_DLONG0']),
-                                float(row_dict['RADIUS1']),
-                                theta)
-                            if (point[1] <= area_filter[0] and
-                                point[1] >= area_filter[2] and
-                                point[0] >= area_filter[1] and
-                                point[0] <= area_filter[3]):
-                                valid = True
-                            circle.append(point)
-                        circle.append(circle[0])
-                        coordinates.extend(circle)
-                        if row_dict['RADIUS2'] != '':
-                            circle = []
-                            for i in range(n):
-                                theta = 360 / n * i
-                                point = projection(
-                                    float(row_dict['WGS_DLAT0']),
-                                    float(row_dict['WGS_DLONG0']),
-                                    float(row_dict['RADIUS2']),
-                                    theta)
-                                if (point[1] <= area_filter[0] and
-                                    point[1] >= area_filter[2] and
-                                    point[0] >= area_filter[1] and
-                                    point[0] <= area_filter[3]):
-                                    valid = True
-                                circle.append(point)
-                            circle.append(circle[0])
+                    radii = [float(row_dict['RADIUS1'])]
+                    if row_dict['RADIUS2'] != '':
+                        radii.append(float(row_dict['RADIUS2']))
+                    point = (float(row_dict['WGS_DLONG0']), float(row_dict['WGS_DLAT0']))
+                    ellipses.append((point, radii, color_xml))
+                    coordinates_xml = []
+                    if geojson:
+                        for circle in geodesy.circle(point[1], point[0], radii):
+                            checked.extend(circle)
                             coordinates.extend(circle)
+                    boundary = [coordinates]
                 # Handle Arcs
                 elif row_dict['SHAP'] == 'R' or row_dict['SHAP'] == 'L':
-                    theta1 = bearing(
-                        float(row_dict['WGS_DLAT0']),
-                        float(row_dict['WGS_DLONG0']),
-                        float(row_dict['WGS_DLAT1']),
-                        float(row_dict['WGS_DLONG1']))
-                    theta2 = bearing(
-                        float(row_dict['WGS_DLAT0']),
-                        float(row_dict['WGS_DLONG0']),
-                        float(row_dict['WGS_DLAT2']),
-                        float(row_dict['WGS_DLONG2']))
-                    angdiff = theta2 - theta1
-                    direction = 1 if row_dict['SHAP'] == 'R' else -1
-                    if angdiff * direction < 0:
-                        angdiff = angdiff + direction * 360
-                    n = 36
-                    for i in range(math.ceil(abs(angdiff) / (360 / n))):
-                        theta = theta1 + direction * i * 360 / n
-                        point = projection(
-                            float(row_dict['WGS_DLAT0']),
-                            float(row_dict['WGS_DLONG0']),
-                            float(row_dict['RADIUS1']),
-                            theta)
-                        if (point[1] <= area_filter[0] and
-                            point[1] >= area_filter[2] and
-                            point[0] >= area_filter[1] and
-                            point[0] <= area_filter[3]):
-                            valid = True
-                        coordinates.append(point)
-                    coordinates.extend([
-                        (round(float(row_dict['WGS_DLONG2']), 4), round(float(row_dict['WGS_DLAT2']), 4))
-                        ])
+                    arc = geodesy.arc(float(row_dict['WGS_DLAT0']),
+                                      float(row_dict['WGS_DLONG0']),
+                                      float(row_dict['RADIUS1']),
+                                      float(row_dict['WGS_DLAT1']),
+                                      float(row_dict['WGS_DLONG1']),
+                                      float(row_dict['WGS_DLAT2']),
+                                      float(row_dict['WGS_DLONG2']),
+                                      1 if row_dict['SHAP'] == 'R' else -1)
+                    point = (round(float(row_dict['WGS_DLONG2']), 4), round(float(row_dict['WGS_DLAT2']), 4))
+                    checked.extend(arc)
+                    checked_xml.extend(arc)
+                    boundary = [coordinates, coordinates_xml]
+                    for c in boundary:
+                        c.extend(arc)
+                        c.append(point)
                 # Handle Polygons
                 else:
                     point = (round(float(row_dict['WGS_DLONG1']), 4), round(float(row_dict['WGS_DLAT1']), 4))
-                    if (point[1] <= area_filter[0] and
-                        point[1] >= area_filter[2] and
-                        point[0] >= area_filter[1] and
-                        point[0] <= area_filter[3]):
-                        valid = True
-                    coordinates.extend([
-                        (round(float(row_dict['WGS_DLONG1']), 4), round(float(row_dict['WGS_DLAT1']), 4)),
-                        (round(float(row_dict['WGS_DLONG2']), 4), round(float(row_dict['WGS_DLAT2']), 4))
-                        ])
-                if len(coordinates) > 2 and coordinates[-2] == coordinates[-3]:
-                    del coordinates[-3]
-                properties = {
-                        'SUAS': row_dict['SUAS_IDENT'],
-                        'Name': row_dict['NAME'],
-                        'ICAO': row_dict['ICAO'],
-                        'TYPE': row_dict['TYPE'],
-                    }
-                SUAS_IDENT = row_dict['SUAS_IDENT']
-            # Write final geometry
-            if coordinates[0] != coordinates[-1]:
-                coordinates.append(coordinates[0])
-            if valid == True:
-                featuresPolygons.append(
-                    Feature(
-                        geometry = Polygon([coordinates]),
-                        properties = properties
-                    )
-                )
-                coordinates.pop()
-                drawing = append2drx(drawing, coordinates,
-                                     polygon=True,
-                                     color_pen_fore=color_xml,
-                                     tooltip=SUAS_IDENT)
-            collection = FeatureCollection(featuresPolygons)
-            if f_out.endswith(xml_handler):
-                with open(f_out, 'wb') as f:
-                    bstr = et.tostring(drawing, encoding='ISO-8859-1', method='xml')
-                    f.write(bstr)
+                    checked.append(point)
+                    checked_xml.append(point)
+                    boundary = [coordinates, coordinates_xml]
+                    for c in boundary:
+                        c.extend([
+                            point,
+                            (round(float(row_dict['WGS_DLONG2']), 4), round(float(row_dict['WGS_DLAT2']), 4))
+                            ])
+                for c in boundary:
+                    if len(c) > 2 and c[-2] == c[-3]:
+                        del c[-3]
+            properties = {
+                    'SUAS': row_dict['SUAS_IDENT'],
+                    'Name': row_dict['NAME'],
+                    'ICAO': row_dict['ICAO'],
+                    'TYPE': row_dict['TYPE'],
+                }
+            # Write completed geometry to each matching output
+            if coordinates and coordinates[0] != coordinates[-1]:
+                closed = coordinates + [coordinates[0]]
             else:
-                with open(f_out, 'w', newline='', encoding='utf-8') as f:
-                    #print(json.dumps(collection, sort_keys=False, indent=4, separators=(',', ': '),ensure_ascii=False))
-                    f.write(json.dumps(collection))
-
-def projection(lat, lng, d, theta):
-    """ projection returns coordinates from bearing (deg true) and range (NM).
-        http://www.movable-type.co.uk/scripts/latlong.html
-    """
-    R = 3438.1451 # Earth's radius (NM)
-    lat = lat * math.pi / 180
-    lng = lng * math.pi / 180
-    theta = theta * math.pi / 180
-    lat2 = math.asin(math.sin(lat) * math.cos(d / R) + math.cos(lat) * math.sin(d / R) * math.cos(theta))
-    lng2 = lng + math.atan2(math.sin(theta) * math.sin(d / R) * math.cos(lat), math.cos(d / R) - math.sin(lat) * math.sin(lat2))
-    return (round((lng2 * 180 / math.pi + 540) % 360 - 180, 5), round(lat2 * 180 / math.pi, 4)) # lng2 normalized +/-180
+                closed = coordinates
+            # DRX polygons close implicitly
+            if coordinates_xml and coordinates_xml[0] == coordinates_xml[-1]:
+                open_xml = coordinates_xml[:-1]
+            else:
+                open_xml = coordinates_xml
+            polygon = None
+            ring_xml = None
+            for spec in matches:
+                area_filter = spec['area']
+                def within(point):
+                    return (point[1] <= area_filter[0] and
+                            point[1] >= area_filter[2] and
+                            point[0] >= area_filter[1] and
+                            point[0] <= area_filter[3])
+                if spec['xml']:
+                    for point, radii, color in ellipses:
+                        if spec['inside'] or within(point):
+                            for radius in radii:
+                                append_xml(spec, [[point]],
+                                           obj = 'ellipse',
+                                           vRadius = radius * nm2ft,
+                                           hRadius = radius * nm2ft,
+                                           color_pen_fore=color,
+                                           tooltip=SUAS_IDENT)
+                    if (len(coordinates_xml) > 3 and
+                        (spec['inside'] or any(map(within, checked_xml)))):
+                        if ring_xml is None:
+                            # Simplified as the closed ring DRX draws
+                            ring_xml = [open_xml + open_xml[:1]]
+                            rings.append(ring_xml)
+                        spec['vertices'][0] += len(open_xml)
+                        append_xml(spec, ring_xml,
+                                   polygon=True,
+                                   color_pen_fore=color_xml,
+                                   tooltip=SUAS_IDENT)
+                elif (len(coordinates) > 3 and
+                      (spec['inside'] or any(map(within, checked)))):
+                    if polygon is None:
+                        polygon = geoencode.geometry('Polygon', [closed])
+                        rings.append(polygon['coordinates'])
+                    spec['vertices'][0] += len(closed)
+                    spec['features'].append(geoencode.feature(polygon, properties))
+        if close:
+            conn.close()
+        if tolerance > 0:
+            # Every boundary at once, so shared boundaries are simplified alike
+            for holder, ring in zip(rings, topo.simplify([holder[0] for holder in rings],
+                                                         tolerance)):
+                holder[0] = ring
+        for spec in specs:
+            if tolerance > 0:
+                spec['vertices'][1] = (
+                    sum(len(f['geometry']['coordinates'][0]) for f in spec['features']) +
+                    sum(len(c[0]) - 1 for c, kwargs in spec['pending'] if kwargs.get('polygon')))
+                print(spec['f_out'] + ': ' + str(spec['vertices'][0]) + ' vertices, ' +
+                      str(spec['vertices'][1]) + ' simplified')
+            if spec['xml']:
+                for coordinates, kwargs in spec['pending']:
+                    draw_xml(spec, coordinates, kwargs)
+                drx.finish(spec['drawing'])
+            elif spec['f_out'].endswith('.topojson'):
+                # Boundaries shared by adjacent airspace stored once
+                with geoencode.output(spec['f_out'], compress) as f:
+                    topo.dump(spec['features'], f, topo.name(spec['f_out']))
+            else:
+                collection = geoencode.feature_collection(spec['features'])
+                with geoencode.output(spec['f_out'], compress) as f:
+                    geoencode.dump(collection, f)
+    finally:
+        # No truncated DRX left if the pass fails (see drx.abort)
+        for spec in specs:
+            if 'drawing' in spec:
+                drx.abort(spec['drawing'])
 
-def bearing(lat1, lng1, lat2, lng2):
-    """ bearing returns bearing (deg true) between two points.
-        http://www.movable-type.co.uk/scripts/latlong.html
+def draw_xml(spec, coordinates, kwargs):
+    """ draw_xml appends a DRX object to an output (see variants.append_xml),
+        a polygon without its closing point as DRX closes it.
     """
-    lat1 = lat1 * math.pi / 180;
-    lng1 = lng1 * math.pi / 180;
-    lat2 = lat2 * math.pi / 180;
-    lng2 = lng2 * math.pi / 180;
-    y = math.sin(lng2 - lng1) * math.cos(lat2);
-    x = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(lng2 - lng1);
-    brng = (math.atan2(y, x) * 180 / math.pi + 360) % 360
-    return brng
+    points = coordinates[0][:-1] if kwargs.get('polygon') else coordinates[0]
+    drx.append(spec['drawing'], points, **kwargs)
 
-def append2drx(drawing, coordinates, 
-               # Default object
-               obj = 'line', # 'line' or 'ellipse' or 'text'
-               tooltip = '', 
-               line_width = '4',
-               line_style = 'solid', 
-               color_pen_fore = [255, 255, 255], 
-               color_pen_back = [255, 0, 0],  # applies when Fill style not "none"
-               fill_style = 'none', 
-               # Default label/Text (anchored to first point)
-               string_label = '',
-               display_label = False, # not used in Text
-               color_label_fore = [0, 0, 0], 
-               color_label_back = [255, 255, 255], 
-               font_size_label = '12', 
-               font_name_label = 'Arial', 
-               backtype_label = 'none',  # 'shadow' (for Text) or 'none' or 'rect'
-               # Ellipse / Text
-               rotation = '0', # deg clockwise
-               # Ellipse only
-               vRadius = 6076, # ft
-               hRadius = 6076, # ft
-               # Text only
-               text_rotate = False, # Rotate with map
-               text_scale = True, # Scale to map
-               text_anchor = 'center_center', # 'center_center' or 'upper_left' etc.
-               text_max = '72', 
-               # Line only
-               polygon = False,
-               line_type = 'rhumb', # 'rhumb' or 'simple'
-               string_embed = '', 
-               color_embed_fore = [0, 0, 0], 
-               color_embed_back = [255, 255, 255],  # applies when Embedded Font backtype not "none"
-               font_size_embed = '12', 
-               font_name_embed = 'Arial', 
-               backtype_embed = 'none'): # 'none' or 'rect'
-    """append2drx appends to JMPS/FalconView Drawing Object XML (*.drx)
-
-    Args:
-        drawing: ElementTree element e.g. et.Element('Objects')
-        coordinates: array of (dlon, dlat) tuples or arrays
-        polygon (optional): boolean e.g. True
-        line_width (optional): string integer e.g. '4'
-        color_pen_fore (optional): RGB tuple or array e.g. [255, 255, 255]
-        (and many more optional arguments)
-
-    Returns:
-        drawing: ElementTree element (with updated Next element attribute)
+def extent(rows):
+    """ extent returns the bounding box (min lat, max lat, min lng, max lng)
+        of an airspace from the raw boundary points, centres and radii of
+        its SUAS rows (see dafif.extent), or None without coordinates.
     """
-    def rgb2dict(rgb):
-        """rgb2dict returns a dict from RGB tuple or array
-        Args:
-            tuple or array of RGB values e.g. [255, 255, 255]
-
-        Returns:
-            dict e.g. {'red':'0', 'green':'0', 'blue':'0'}
-        """
-        color = {'red':str(rgb[0])}
-        color['green'] = str(rgb[1])
-        color['blue'] = str(rgb[2])
-        return color
-    # Setup
-    drawing.set('xmlns', 'urn:JMPS/JMPS')
-    color_pen_fore = rgb2dict(color_pen_fore)
-    color_pen_back = rgb2dict(color_pen_back)
-    color_label_fore = rgb2dict(color_label_fore)
-    color_label_back = rgb2dict(color_label_back)
-    color_embed_fore = rgb2dict(color_embed_fore)
-    color_embed_back = rgb2dict(color_embed_back)
-    try:
-        n = int(drawing.attrib['Next'])
-    except:
-        n = 0
-    # Create SVG XML element
-    # https://nick.onetwenty.org/index.php/2010/04/07/creating-svg-files-with-python/
-    obj_et = et.SubElement(drawing, 'Object', ID=str(n))
-    # Detail
-    obj_detail = et.SubElement(obj_et, 'Detail')
-    detail_comment = et.SubElement(obj_detail, 'Comment')
-    detail_status = et.SubElement(obj_detail, 'Status')
-    detail_tooltip = et.SubElement(obj_detail, 'Tooltip')
-    detail_tooltip.text = tooltip
-    # Ellipse / Text / Line
-    if obj.lower() == 'ellipse':
-        thing = et.SubElement(obj_et, 'Ellipse', style=line_style,
-                              rotate=rotation)
-    elif obj.lower() == 'text':
-        thing = et.SubElement(obj_et, 'Text', rotate=rotation,
-                              fixed_degrees='0', 
-                              rotatewithmap=str(text_rotate).lower(),
-                              fixed=str(not(text_scale)).lower(),
-                              anchor=text_anchor,
-                              maxsize=text_max)
-    else:
-        thing = et.SubElement(obj_et, 'Line', style=line_style,
-                              linetype=line_type,
-                              polygon=str(polygon).lower())
-    pen = et.SubElement(thing, 'Pen', width=line_width)
-    if obj.lower() in ('ellipse', 'line'):
-        c = color_pen_fore
-        c.update({'type':'fore'})
-        color = et.SubElement(pen, 'Color', c)
-        c = color_pen_back
-        c.update({'type':'back'})
-        color = et.SubElement(pen, 'Color', c) # applies when Fill style not "none"
-        fill = et.SubElement(thing, 'Fill', style=fill_style) # uses Pen Color type "back"
-    if obj.lower() == 'ellipse':
-        radius = et.SubElement(thing, 'VRadius')
-        radius.text = str(round(vRadius))
-        radius = et.SubElement(thing, 'HRadius')
-        radius.text = str(round(hRadius))
-    if obj.lower() in ('ellipse', 'text'):
-        point = et.SubElement(thing, 'Point', type='center')
-        latitude = et.SubElement(point, 'LATITUDE')
-        latitude.text = str(coordinates[-1][1])
-        longitude = et.SubElement(point, 'LONGITUDE')
-        longitude.text = str(coordinates[-1][0])
-    if obj.lower() == 'text':
-        font = et.SubElement(thing, 'Font', size=font_size_label, attributes='0',
-                              backtype=backtype_label)
-        string = et.SubElement(thing, 'String')
-    else:
-        label = et.SubElement(thing, 'Label', Display=str(display_label).lower()) # anchored to first point
-        font = et.SubElement(label, 'Font', size=font_size_label, attributes='0',
-                             backtype=backtype_label)
-        string = et.SubElement(label, 'String')
-    name = et.SubElement(font, 'Name')
-    name.text = font_name_label
-    c = color_label_fore
-    c.update({'type':'fore'})
-    color = et.SubElement(font, 'Color', c)
-    c = color_label_back
-    c.update({'type':'back'})
-    color = et.SubElement(font, 'Color', c)
-    string.text =  string_label
-    if obj.lower() == 'line':
-        for p in coordinates:
-            point = et.SubElement(thing, 'Point')
-            latitude = et.SubElement(point, 'LATITUDE')
-            latitude.text = str(p[1])
-            longitude = et.SubElement(point, 'LONGITUDE')
-            longitude.text = str(p[0])
-        embed = et.SubElement(thing, 'Embedded', text_position='center')
-        font = et.SubElement(embed, 'Font', size=font_size_embed, attributes='0',
-                             backtype=backtype_embed)
-        name = et.SubElement(font, 'Name')
-        name.text = font_name_embed
-        c = color_embed_fore
-        c.update({'type':'fore'})
-        color = et.SubElement(font, 'Color', c)
-        c = color_embed_back
-        c.update({'type':'back'})
-        color = et.SubElement(font, 'Color', c) # applies when Embedded Font backtype not "none"
-        string = et.SubElement(embed, 'String')
-        string.text =  string_embed
-    drawing.set('Next', str(n+1))
-    return drawing
+    points, radii = dafif.COORDS['SUAS']
+    bbox = None
+    for row in rows:
+        b = dafif.extent([(row[lat], row[lng]) for lat, lng in points],
+                         [row[r] for r in radii])
+        if b is None:
+            continue
+        if bbox is None:
+            bbox = list(b)
+        else:
+            bbox = [min(bbox[0], b[0]), max(bbox[1], b[1]),
+                    min(bbox[2], b[2]), max(bbox[3], b[3])]
+    return bbox
 
 if __name__ == "__main__":
     main()
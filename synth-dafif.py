@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+from tkinter import Tk
+from tkinter.filedialog import askdirectory
+import geodesy
+import os
+import random
+
+SCALE = 1
+SEED = 1
+# Records per unit of scale
+ARPTS = 200 # airports
+SUASS = 300 # airspaces
+MTRS = 150 # routes
+COUNTRIES = ('US', 'CA', 'JA', 'KS', 'GM', 'UK', 'AS', 'BR')
+CYCLE_DATE = '202301'
+ABSORBING = ('BAK-12', 'BAK-13', 'MA-1', 'BAK-14', 'E-28') # APPC codes 10...
+ENGAGING = ('BAK-15', 'NET', 'HOOK') # APPC codes 20...
+# Columns of each file in DAFIF order (columns not generated are left empty)
+ARPT = ('ARPT_IDENT', 'NAME', 'STATE_PROV', 'ICAO', 'FAA_HOST_ID', 'LOC_HDATUM',
+        'WGS_DATUM', 'WGS_LAT', 'WGS_DLAT', 'WGS_LONG', 'WGS_DLONG', 'ELEV',
+        'TYPE', 'MAG_VAR', 'WAC', 'BEACON', 'SECOND_ARPT', 'OPR_AGY', 'SEC_NAME',
+        'SEC_ICAO', 'SEC_FAA', 'SEC_OPR_AGY', 'CYCLE_DATE', 'TERRAIN', 'HYDRO')
+RWY = ('ARPT_IDENT', 'HIGH_IDENT', 'LOW_IDENT', 'HIGH_HDG', 'LOW_HDG', 'LENGTH',
+       'RWY_WIDTH', 'SURFACE', 'PCN')
+AGEAR = ('ARPT_IDENT', 'RWY_IDENT', 'LOCATION', 'TYPE', 'CYCLE_DATE')
+APPC = ('CODE', 'DESC')
+# Minima for each aircraft category (iap.py reads category C by position:
+# DH/MDA 15, HAT/HAA 17, ceiling 18 and visibility 19)
+TRM_MIN = (('ARPT_IDENT', 'PROC', 'TRM_IDENT', 'TRM_NAME', 'MIN_TYPE') +
+           tuple('CAT_' + cat + '_' + c for cat in 'ABCDE'
+                 for c in ('DH_MDA', 'DH_MDA_TYPE', 'HAT_HAA', 'WX_CEIL', 'WX_VIS')) +
+           ('CYCLE_DATE',))
+SUAS = ('SUAS_IDENT', 'SECTOR', 'SEG_NBR', 'NAME', 'TYPE', 'ICAO', 'SHAP',
+        'DERIVATION', 'WGS_LAT1', 'WGS_DLAT1', 'WGS_LONG1', 'WGS_DLONG1',
+        'WGS_LAT2', 'WGS_DLAT2', 'WGS_LONG2', 'WGS_DLONG2', 'WGS_LAT0',
+        'WGS_DLAT0', 'WGS_LONG0', 'WGS_DLONG0', 'RADIUS1', 'RADIUS2',
+        'BEARING1', 'BEARING2', 'NAV_IDENT', 'NAV_TYPE', 'NAV_CTRY',
+        'NAV_KEY_CD', 'CYCLE_DATE')
+SUAS_CTRY = ('SUAS_IDENT', 'SECTOR', 'CTRY_1')
+MTR_OV = ('MTR_IDENT', 'PT_IDENT', 'NX_POINT', 'PT_LAT', 'PT_DLAT', 'PT_LONG',
+          'PT_DLONG', 'NX_LAT', 'NX_DLAT', 'NX_LONG', 'NX_DLONG', 'CYCLE_DATE')
+
+
+def main():
+    """ synth-dafif.py writes a synthetic DAFIF (the files read by the CCX
+        tools, in DAFIF's layout) of any size, so that the tools can be
+        benchmarked (see bench.py) without distributing DAFIF.
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Writes a synthetic DAFIF for benchmarking the CCX tools.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-d', metavar = 'DAFIFT', default = '',
+                        help = 'full path to "DAFIFT" directory to write')
+    parser.add_argument('-s', metavar = 'SCALE', default = SCALE, type=int,
+                        help = 'size (' + str(ARPTS) + ' airports, ' + str(SUASS) +
+                        ' airspaces and ' + str(MTRS) + ' routes each) (int)')
+    parser.add_argument('-r', metavar = 'SEED', default = SEED, type=int,
+                        help = 'random seed; the same seed and scale write the same files (int)')
+    args = parser.parse_args()
+    d = args.d
+    if len(d) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        d = askdirectory(title='Select the folder "DAFIFT" to write')
+    if len(d) > 0:
+        for f_in, n in generate(d, args.s, args.r).items():
+            print(f_in + ': ' + str(n))
+
+def generate(d, scale=SCALE, seed=SEED):
+    """ generate writes tab-delimited ARPT, RWY, AGEAR, APPC, TRM_MIN, SUAS,
+        SUAS_CTRY and MTR_OV files under a "DAFIFT" directory (as dafif.TABLES),
+        with airports, airspace and routes scattered at random.
+
+    Args:
+        d: full path to "DAFIFT" directory
+        scale (optional): int e.g. 20
+        seed (optional): int e.g. 1
+
+    Returns:
+        dict of {file: rows} e.g. {'\\ARPT\\ARPT.txt': 200, ...}
+    """
+    rand = random.Random(seed)
+    counts = {}
+    tables = airports(rand, scale)
+    tables.update(airspace(rand, scale))
+    tables.update(routes(rand, scale))
+    for f_in, (title, rows) in tables.items():
+        os.makedirs(os.path.dirname(d + f_in), exist_ok=True)
+        with open(d + f_in, 'w', newline='') as f:
+            f.write('\t'.join(title) + '\n')
+            for row in rows:
+                f.write('\t'.join(str(c) for c in row) + '\n')
+        counts[f_in] = len(rows)
+    return counts
+
+def airports(rand, scale=SCALE):
+    """ airports returns ARPT with a few runways each (RWY), arresting gear
+        at about a third of them (AGEAR, APPC) and approaches at half
+        (TRM_MIN).
+
+    Returns:
+        dict of {file: (title, rows)}
+    """
+    arpt, rwy, agear, trm_min = [], [], [], []
+    for i in range(ARPTS * scale):
+        country = rand.choice(COUNTRIES)
+        ident = '%s%05d' % (country, i)
+        if country == 'US' and i % 3:
+            icao = 'K%03d' % i
+        else:
+            icao = 'X%03d' % i if i % 5 else '' # some FAA host ID only
+        lat = round(rand.uniform(-60, 70), 8)
+        lng = round(rand.uniform(-179.9, 179.9), 8)
+        arpt.append([ident, 'AIRPORT %d' % i, '', icao, '%03d' % i, 'WGE', 'WGE',
+                     '', lat, '', lng, 100, 'A', '', 1, '', '', '', '',
+                     'Y%03d' % i if i % 7 == 0 else '', '', '', CYCLE_DATE, '', ''])
+        for k in range(rand.randint(1, 3)):
+            h = rand.randint(1, 18)
+            rwy.append([ident, '%02d%s' % (h + 18, 'LRC'[k] if k else ''),
+                        '%02d%s' % (h, 'RLC'[k] if k else ''), 0, 0,
+                        rand.choice([3000, 6000, 8000, 10000, 12000]),
+                        rand.choice([75, 100, 150, 200]), 'ASP', ''])
+        if rand.random() < 0.3:
+            for k in range(rand.randint(1, 4)):
+                agear.append([ident, '%02d' % rand.randint(1, 36),
+                              '%04d' % rand.randint(500, 3000),
+                              '%d%d' % (rand.randint(10, 9 + len(ABSORBING)),
+                                        rand.randint(20, 19 + len(ENGAGING))),
+                              CYCLE_DATE])
+        if rand.random() < 0.5:
+            for k in range(rand.randint(1, 6)):
+                t = rand.choice('TIRVNL')
+                rwy_ident = 'RW%02d' % rand.randint(1, 36)
+                trm_min.append(record(
+                    TRM_MIN, ARPT_IDENT=ident, PROC=rand.randint(1, 3),
+                    TRM_IDENT=rand.choice([t + '%02d ' % rand.randint(1, 36) + rwy_ident,
+                                           t + '-A CIRCLING', t + ' COPTER ' + rwy_ident]),
+                    CAT_C_DH_MDA=rand.randint(200, 900),
+                    CAT_C_HAT_HAA=rand.choice(['', rand.randint(150, 1200)]),
+                    CAT_C_WX_CEIL='0' + str(rand.randint(2, 9)),
+                    CAT_C_WX_VIS=rand.randint(1, 3), CYCLE_DATE=CYCLE_DATE))
+    return {'\\ARPT\\ARPT.txt': (ARPT, arpt),
+            '\\ARPT\\RWY.txt': (RWY, rwy),
+            '\\ARPT\\AGEAR.txt': (AGEAR, agear),
+            '\\APPC\\APPC_ABSORBING_SYS.txt':
+                (APPC, [[i, x] for i, x in enumerate(ABSORBING, 10)]),
+            '\\APPC\\APPC_ENGAGING_DEV.txt':
+                (APPC, [[i, x] for i, x in enumerate(ENGAGING, 20)]),
+            '\\TRM\\TRM_MIN.txt': (TRM_MIN, trm_min)}
+
+def airspace(rand, scale=SCALE):
+    """ airspace returns SUAS and SUAS_CTRY: circles (some with two radii)
+        and polygons of great circle (G), rhumb line (H) and arc (R, L)
+        sectors.
+
+    Returns:
+        dict of {file: (title, rows)}
+    """
+    suas, suas_ctry = [], []
+    def row(ident, seg_nbr, suas_type, shap, p1=('', ''), p2=('', ''), p0=('', ''),
+            radius1='', radius2=''):
+        return record(SUAS, SUAS_IDENT=ident, SECTOR='A', SEG_NBR=seg_nbr,
+                      NAME='AREA ' + ident, TYPE=suas_type, ICAO='KZAB', SHAP=shap,
+                      WGS_DLAT1=p1[1], WGS_DLONG1=p1[0], WGS_DLAT2=p2[1],
+                      WGS_DLONG2=p2[0], WGS_DLAT0=p0[1], WGS_DLONG0=p0[0],
+                      RADIUS1=radius1, RADIUS2=radius2, CYCLE_DATE=CYCLE_DATE)
+    for i in range(SUASS * scale):
+        country = rand.choice(COUNTRIES)
+        ident = '%s%05dA' % (country, i)
+        suas_type = rand.choice('RMAWTDP')
+        lat = rand.uniform(-60, 70)
+        lng = rand.uniform(-179.5, 179.5)
+        centre = (round(lng, 8), round(lat, 8))
+        suas_ctry.append([ident, 'A', country])
+        kind = rand.random()
+        if kind < 0.3:
+            suas.append(row(ident, 1, suas_type, 'C', p0=centre,
+                            radius1=rand.choice([3, 5, 10, 20]),
+                            radius2=rand.choice(['', 2])))
+            continue
+        n = rand.randint(3, 8)
+        r = rand.uniform(5, 40)
+        points = geodesy.projection(lat, lng, [r * rand.uniform(0.7, 1.3) for k in range(n)],
+                                    [360 / n * k for k in range(n)])
+        for k in range(n):
+            p1, p2 = points[k], points[(k + 1) % n]
+            if kind > 0.7 and k == 0:
+                suas.append(row(ident, k + 1, suas_type, rand.choice('RL'), p1, p2,
+                                centre, round(r, 2)))
+            else:
+                suas.append(row(ident, k + 1, suas_type, rand.choice('GH'), p1, p2))
+    return {'\\SUAS\\SUAS.TXT': (SUAS, suas),
+            '\\SUAS\\SUAS_CTRY.TXT': (SUAS_CTRY, suas_ctry)}
+
+def routes(rand, scale=SCALE):
+    """ routes returns MTR_OV: IR, VR and SR routes of a few segments each
+        wandering over CONUS.
+
+    Returns:
+        dict of {file: (title, rows)}
+    """
+    mtr_ov = []
+    for i in range(MTRS * scale):
+        ident = rand.choice(['IR', 'VR', 'SR']) + '%03d' % i
+        lat = rand.uniform(25, 48)
+        lng = rand.uniform(-125, -70)
+        for k in range(rand.randint(2, 8)):
+            nx_lat = lat + rand.uniform(-0.5, 0.5)
+            nx_lng = lng + rand.uniform(-0.5, 0.5)
+            mtr_ov.append(record(MTR_OV, MTR_IDENT=ident, PT_IDENT=chr(65 + k),
+                                 NX_POINT=chr(66 + k), PT_DLAT=round(lat, 8),
+                                 PT_DLONG=round(lng, 8), NX_DLAT=round(nx_lat, 8),
+                                 NX_DLONG=round(nx_lng, 8), CYCLE_DATE=CYCLE_DATE))
+            lat, lng = nx_lat, nx_lng
+    return {'\\MTR\\MTR_OV.txt': (MTR_OV, mtr_ov)}
+
+def record(title, **values):
+    """ record returns a row of the columns of title, with values given by
+        column name and every other column empty.
+    """
+    return [values.get(column, '') for column in title]
+
+if __name__ == "__main__":
+    main()
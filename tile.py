@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+from tkinter import Tk
+from tkinter.filedialog import askdirectory, askopenfilename
+import geodesy
+import geoencode
+import importlib  # merge-geojson.py
+import json
+import math
+import os
+import shutil
+
+BUFFER = 16 / 256 # tile buffer (fraction of a tile) so clipped edges meet
+PIXELS = 256 # tile size (px)
+
+
+def main():
+    """ tile.py cuts a GeoJSON layer into z/x/y tiles for the CCX web map.
+        Map at www.robertnordlund.com/ccx/
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Cuts a GeoJSON layer into z/x/y tiles.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-i', metavar = 'INFILE', default = '',
+                        help = 'full path to GeoJSON layer (*.geojson, *.json)')
+    parser.add_argument('-o', metavar = 'PATH', default = '',
+                        help = 'full path to tile directory')
+    parser.add_argument('-z', metavar = 'ZOOM', default = '0 8',
+                        help = 'minimum and maximum zoom (e.g. "0 8")')
+    parser.add_argument('-t', metavar = 'TOLERANCE', default = 1, type=float,
+                        help = 'simplification at each zoom (px) (0 for none)')
+    parser.add_argument('-c', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
+    args = parser.parse_args()
+    infile = args.i
+    d_out = args.o
+    minzoom, maxzoom = map(int, args.z.split())
+    if len(infile) < 1 or len(d_out) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        infile = askopenfilename(title='Select GeoJSON layer',
+                                 filetypes=[('GeoJSON','*.geojson'),('JSON','*.json')])
+        if len(infile) > 0:
+            d_out = askdirectory(title='Select tile folder')
+    if len(infile) > 0 and len(d_out) > 0:
+        index = tile(infile, d_out, minzoom, maxzoom, args.t, args.c)
+        for z, tiles in index['tiles'].items():
+            print('Zoom ' + z + ': ' + str(len(tiles)) + ' tiles')
+
+def tile(infile, d_out, minzoom=0, maxzoom=8, pixels=1, compress=False):
+    """ tile writes the features of a GeoJSON layer, clipped to each tile
+        (with a buffer) and simplified to the zoom and latitude of the tile,
+        to "z\\x\\y.geojson" files, and an index of the tiles written to
+        "index.json". The tiles are written to a ".tmp" directory that
+        replaces d_out only once all are written, so no tile of an earlier
+        run is left behind (or a partial pyramid if writing fails).
+
+    Args:
+        infile: full path to GeoJSON layer (*.geojson, *.json)
+        d_out: full path to tile directory
+        minzoom (optional): int e.g. 0
+        maxzoom (optional): int e.g. 8
+        pixels (optional): simplification at each zoom (px) e.g. 1
+        compress (optional): boolean also write *.gz (and *.br) (see geoencode.output)
+
+    Returns:
+        index: dict of layer, zooms, bounds and {z: [[x, y, features], ...]}
+    """
+    merge_geojson = importlib.import_module('merge-geojson')
+    features = list(merge_geojson.features(infile))
+    index = {'layer': os.path.splitext(os.path.basename(infile.replace('\\', '/')))[0],
+             'minzoom': minzoom, 'maxzoom': maxzoom, 'bounds': None,
+             'tiles': {}}
+    boxes = [bounds(f['geometry']) for f in features]
+    for box in boxes:
+        if box is not None:
+            index['bounds'] = (list(box) if index['bounds'] is None else
+                               [min(index['bounds'][0], box[0]),
+                                min(index['bounds'][1], box[1]),
+                                max(index['bounds'][2], box[2]),
+                                max(index['bounds'][3], box[3])])
+    d_tmp, d_old = d_out + '.tmp', d_out + '.old'
+    for d in (d_tmp, d_old): # left by an earlier run that failed
+        if os.path.exists(d):
+            shutil.rmtree(d)
+    try:
+        write(features, boxes, index, d_tmp, pixels, compress)
+    except BaseException:
+        shutil.rmtree(d_tmp, ignore_errors=True)
+        raise
+    if os.path.exists(d_out):
+        os.replace(d_out, d_old)
+    os.replace(d_tmp, d_out)
+    shutil.rmtree(d_old, ignore_errors=True)
+    return index
+
+def write(features, boxes, index, d_out, pixels=1, compress=False):
+    """ write writes the tiles of each zoom of an index, and the index
+        (see tile).
+    """
+    minzoom, maxzoom = index['minzoom'], index['maxzoom']
+    for z in range(minzoom, maxzoom + 1):
+        n = 2 ** z
+        # NM per pixel at the equator (scaled by cos(latitude) of each row of
+        # tiles, as Web Mercator), and decimal places to resolve a pixel
+        tolerance = pixels * 360 * 60 / (PIXELS * n)
+        precision = min(geoencode.PRECISION,
+                        max(1, math.ceil(math.log10(PIXELS * n / 360))))
+        buckets = {}
+        for f, box in zip(features, boxes):
+            if box is None:
+                continue
+            geometry = f['geometry']
+            simplified = {} # geometry simplified for each row of tiles
+            x0 = max(0, int(lng2x(box[0], z) - BUFFER))
+            x1 = min(n - 1, int(lng2x(box[2], z) + BUFFER))
+            y0 = max(0, int(lat2y(box[3], z) - BUFFER))
+            y1 = min(n - 1, int(lat2y(box[1], z) + BUFFER))
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    if y not in simplified:
+                        simplified[y] = geometry
+                        if tolerance > 0 and geometry['type'] != 'Point':
+                            simplified[y] = simplify(geometry, tolerance * math.cos(
+                                y2lat(y + 0.5, z) * math.pi / 180))
+                    clipped = clip(simplified[y], tile_bounds(z, x, y, BUFFER))
+                    if clipped is not None:
+                        buckets.setdefault((x, y), []).append(
+                            geoencode.feature(clipped, f.get('properties')))
+        index['tiles'][str(z)] = []
+        for (x, y), fc in sorted(buckets.items()):
+            d = d_out + '\\' + str(z) + '\\' + str(x)
+            os.makedirs(d, exist_ok=True)
+            with geoencode.output(d + '\\' + str(y) + '.geojson', compress) as f:
+                geoencode.dump(geoencode.feature_collection(fc), f, precision=precision,
+                               separators=(',', ':'))
+            index['tiles'][str(z)].append([x, y, len(fc)])
+    os.makedirs(d_out, exist_ok=True)
+    with geoencode.output(d_out + '\\index.json', compress) as f:
+        f.write(json.dumps(index, separators=(',', ':')))
+
+def lng2x(lng, z):
+    """ lng2x returns the (fractional) tile column of a longitude.
+    """
+    return (lng + 180) / 360 * 2 ** z
+
+def lat2y(lat, z):
+    """ lat2y returns the (fractional) tile row of a latitude (Web Mercator,
+        clamped to +/-85.0511 deg).
+    """
+    lat = max(min(lat, 85.0511), -85.0511) * math.pi / 180
+    return (1 - math.log(math.tan(lat) + 1 / math.cos(lat)) / math.pi) / 2 * 2 ** z
+
+def y2lat(y, z):
+    """ y2lat returns the latitude of a (fractional) tile row (Web Mercator).
+    """
+    return math.atan(math.sinh(math.pi * (1 - 2 * y / 2 ** z))) * 180 / math.pi
+
+def tile_bounds(z, x, y, buffer=0):
+    """ tile_bounds returns (west, south, east, north) of a tile (deg),
+        widened by a buffer (fraction of a tile).
+    """
+    n = 2 ** z
+    return ((x - buffer) / n * 360 - 180, y2lat(y + 1 + buffer, z),
+            (x + 1 + buffer) / n * 360 - 180, y2lat(y - buffer, z))
+
+def bounds(geometry):
+    """ bounds returns (west, south, east, north) of a geometry, or None.
+    """
+    if not geometry or not geometry.get('coordinates'):
+        return None
+    points = list(positions(geometry['coordinates']))
+    return (min(p[0] for p in points), min(p[1] for p in points),
+            max(p[0] for p in points), max(p[1] for p in points))
+
+def positions(coordinates):
+    """ positions yields the (lng, lat) positions of nested coordinates.
+    """
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates
+    else:
+        for c in coordinates:
+            yield from positions(c)
+
+def simplify(geometry, tolerance):
+    """ simplify returns a geometry with its lines and rings simplified to
+        within the tolerance (NM) (see geodesy.simplify).
+    """
+    def lines(c, depth):
+        if depth == 0:
+            return geodesy.simplify([tuple(p) for p in c], tolerance)
+        return [lines(part, depth - 1) for part in c]
+    depth = {'MultiPoint': None, 'LineString': 0, 'MultiLineString': 1,
+             'Polygon': 1, 'MultiPolygon': 2}.get(geometry['type'])
+    if depth is None:
+        return geometry
+    return geoencode.geometry(geometry['type'], lines(geometry['coordinates'], depth))
+
+def clip(geometry, box):
+    """ clip returns a geometry clipped to a box (west, south, east, north),
+        or None if nothing is left.
+    """
+    t = geometry['type']
+    c = geometry['coordinates']
+    if t == 'Point':
+        return geometry if inside(c, box) else None
+    if t == 'MultiPoint':
+        c = [p for p in c if inside(p, box)]
+    elif t == 'LineString':
+        c = clip_line(c, box)
+        t = 'MultiLineString'
+    elif t == 'MultiLineString':
+        c = [part for line in c for part in clip_line(line, box)]
+    elif t == 'Polygon':
+        c = clip_polygon(c, box)
+    elif t == 'MultiPolygon':
+        c = [p for p in (clip_polygon(polygon, box) for polygon in c) if p]
+    else:
+        return None
+    if not c:
+        return None
+    if t == 'MultiLineString' and len(c) == 1:
+        return geoencode.geometry('LineString', c[0])
+    return geoencode.geometry(t, c)
+
+def inside(p, box):
+    """ inside returns True if a position is within a box.
+    """
+    return box[0] <= p[0] <= box[2] and box[1] <= p[1] <= box[3]
+
+def clip_line(line, box):
+    """ clip_line returns the parts of a line within a box (Liang-Barsky
+        for each segment, joining consecutive segments).
+    """
+    parts = []
+    part = []
+    for a, b in zip(line, line[1:]):
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        t0, t1 = 0, 1
+        for p, q in ((-dx, a[0] - box[0]), (dx, box[2] - a[0]),
+                     (-dy, a[1] - box[1]), (dy, box[3] - a[1])):
+            if p == 0:
+                if q < 0:
+                    t0, t1 = 1, 0
+            elif p < 0:
+                t0 = max(t0, q / p)
+            else:
+                t1 = min(t1, q / p)
+        if t0 > t1:
+            if part:
+                parts.append(part)
+                part = []
+            continue
+        start = (a[0] + t0 * dx, a[1] + t0 * dy) if t0 > 0 else tuple(a)
+        end = (a[0] + t1 * dx, a[1] + t1 * dy) if t1 < 1 else tuple(b)
+        if not part:
+            part = [start]
+        part.append(end)
+        if t1 < 1:
+            parts.append(part)
+            part = []
+    if part:
+        parts.append(part)
+    return parts
+
+def clip_polygon(rings, box):
+    """ clip_polygon returns the rings of a polygon clipped to a box
+        (Sutherland-Hodgman), or [] if the exterior ring is clipped away.
+    """
+    clipped = []
+    for ring in rings:
+        ring = clip_ring(ring, box)
+        if len(ring) < 4:
+            if not clipped:
+                return []
+            continue
+        clipped.append(ring)
+    return clipped
+
+def clip_ring(ring, box):
+    """ clip_ring returns a closed ring clipped to a box (Sutherland-Hodgman).
+    """
+    points = [tuple(p) for p in ring]
+    for axis, edge, keep in ((0, box[0], 1), (0, box[2], -1),
+                             (1, box[1], 1), (1, box[3], -1)):
+        if not points:
+            break
+        output = []
+        for a, b in zip(points, points[1:] + points[:1]):
+            a_in = (a[axis] - edge) * keep >= 0
+            b_in = (b[axis] - edge) * keep >= 0
+            if a_in:
+                output.append(a)
+            if a_in != b_in:
+                t = (edge - a[axis]) / (b[axis] - a[axis])
+                p = [a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])]
+                p[axis] = edge
+                output.append(tuple(p))
+        points = output
+    if points and points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__version__ = '2026.10.18'
+
+import argparse  # process optional arguments
+from tkinter import Tk
+from tkinter.filedialog import askopenfilename, asksaveasfilename
+import geodesy
+import geoencode
+import importlib  # merge-geojson.py
+import json
+import os
+
+PRECISION = 4 # decimal places of coordinates kept (quantization)
+
+
+def main():
+    """ topo.py converts a GeoJSON polygon layer to TopoJSON, storing each
+        boundary shared by adjacent polygons once.
+        Map at www.robertnordlund.com/ccx/
+    """
+    # INPUTS
+    parser = argparse.ArgumentParser(
+        description = 'Converts a GeoJSON polygon layer to TopoJSON.',
+        epilog = 'Lack of path arguments will invoke GUI elements.')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('-i', metavar = 'INFILE', default = '',
+                        help = 'full path to GeoJSON layer (*.geojson, *.json)')
+    parser.add_argument('-o', metavar = 'OUTFILE', default = '',
+                        help = 'full path to output file (*.topojson)')
+    parser.add_argument('-p', metavar = 'PRECISION', type=int, default = PRECISION,
+                        help='decimal places of coordinates (int)')
+    parser.add_argument('-z', action = 'store_true',
+                        help = 'also write compressed copies (*.gz, and *.br if brotli is installed)')
+    args = parser.parse_args()
+    infile = args.i
+    outfile = args.o
+    if len(infile) < 1 or len(outfile) < 1:
+        # http://stackoverflow.com/a/3579625
+        Tk().withdraw()  # we don't want a full GUI so hide the root window
+        infile = askopenfilename(title='Select GeoJSON layer',
+                                 filetypes=[('GeoJSON','*.geojson'),('JSON','*.json')])
+        if len(infile) > 0:
+            outfile = asksaveasfilename(title='Save As',
+                                        filetypes=[('TopoJSON', '*.topojson')],
+                                        defaultextension='.topojson')
+    if len(infile) > 0 and len(outfile) > 0:
+        merge_geojson = importlib.import_module('merge-geojson')
+        features = list(merge_geojson.features(infile))
+        with geoencode.output(outfile, args.z) as f:
+            topology = dump(features, f, name(outfile), args.p)
+        print(str(len(features)) + ' features, ' + str(len(topology['arcs'])) + ' arcs')
+
+def name(f_out):
+    """ name returns the object name for an output file e.g. 'suas' for
+        "C:\\ccx\\suas.topojson".
+    """
+    return os.path.splitext(os.path.basename(f_out.replace('\\', '/')))[0]
+
+def dump(features, f, layer, precision=PRECISION):
+    """ dump writes GeoJSON features as a TopoJSON Topology (see topology).
+
+    Returns:
+        topology: dict
+    """
+    t = topology(features, layer, precision)
+    f.write(json.dumps(t, separators=(',', ':')))
+    return t
+
+def topology(features, layer, precision=PRECISION):
+    """ topology returns a TopoJSON Topology of GeoJSON (Multi)Polygon
+        features, quantized to decimal places, with each ring cut into arcs
+        at the junctions where adjacent rings meet or part. Arcs shared by
+        rings (in either direction) are stored once, delta-encoded.
+        https://github.com/topojson/topojson-specification
+
+    Args:
+        features: list of GeoJSON Features
+        layer: name of the GeometryCollection object e.g. 'suas'
+        precision (optional): decimal places of coordinates e.g. 4
+
+    Returns:
+        topology: dict
+    """
+    scale = 10 ** -precision
+    rings = [] # (feature index, polygon index, ring) quantized
+    x0 = y0 = None
+    for f in features:
+        for ring in (ring for polygon in polygons_of(f) for ring in polygon):
+            for x, y in ring:
+                x0 = x if x0 is None else min(x0, x)
+                y0 = y if y0 is None else min(y0, y)
+    x0 = x0 or 0
+    y0 = y0 or 0
+    for i, f in enumerate(features):
+        for j, polygon in enumerate(polygons_of(f)):
+            for ring in polygon:
+                q = []
+                for x, y in ring:
+                    p = (round((x - x0) / scale), round((y - y0) / scale))
+                    if not q or q[-1] != p:
+                        q.append(p)
+                if len(q) > 1 and q[0] == q[-1]:
+                    q.pop()
+                rings.append((i, j, q))
+    arcs, refs = cut([ring for i, j, ring in rings])
+    geometries = [[[] for polygon in range(len(polygons_of(f)))] for f in features]
+    for (i, j, ring), ring_refs in zip(rings, refs):
+        if ring_refs:
+            geometries[i][j].append(ring_refs)
+    # Delta-encode arcs
+    encoded = []
+    for points in arcs:
+        delta = [list(points[0])]
+        for a, b in zip(points, points[1:]):
+            delta.append([b[0] - a[0], b[1] - a[1]])
+        encoded.append(delta)
+    collection = []
+    for f, polygons in zip(features, geometries):
+        geometry = f.get('geometry') or {}
+        if geometry.get('type') == 'Polygon' and polygons[0]:
+            g = {'type': 'Polygon', 'arcs': polygons[0]}
+        elif geometry.get('type') == 'MultiPolygon' and any(polygons):
+            g = {'type': 'MultiPolygon', 'arcs': [p for p in polygons if p]}
+        else:
+            g = {'type': None}
+        if f.get('properties') is not None:
+            g['properties'] = f['properties']
+        collection.append(g)
+    return {'type': 'Topology',
+            'transform': {'scale': [scale, scale], 'translate': [x0, y0]},
+            'objects': {layer: {'type': 'GeometryCollection', 'geometries': collection}},
+            'arcs': encoded}
+
+def cut(rings):
+    """ cut cuts rings into arcs at the junctions where adjacent rings meet
+        or part (points whose neighbours differ between, or within, rings),
+        storing each arc once whichever ring (and direction) it came from.
+
+    Args:
+        rings: list of rings, each a list of points without its closing
+            point or repeated consecutive points
+
+    Returns:
+        arcs: list of tuples of points
+        refs: list for each ring of arc indexes (~index if reversed) in
+            order ([] for rings of fewer than 3 points)
+    """
+    # Junctions
+    neighbours = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for k, p in enumerate(ring):
+            pair = frozenset((ring[k - 1], ring[(k + 1) % n]))
+            if neighbours.setdefault(p, pair) != pair:
+                junctions.add(p)
+    # Cut rings into arcs, storing each once
+    arcs = []
+    index = {}
+    def arc(points):
+        """ arc returns the index of an arc (~index if reversed), adding it.
+        """
+        key = tuple(points)
+        if key in index:
+            return index[key]
+        if key[::-1] in index:
+            return ~index[key[::-1]]
+        index[key] = len(arcs)
+        arcs.append(key)
+        return index[key]
+    refs = []
+    for ring in rings:
+        if len(ring) < 3:
+            refs.append([])
+            continue
+        cuts = [k for k, p in enumerate(ring) if p in junctions]
+        if not cuts:
+            # Whole ring, from its least point so identical rings match
+            # (in either direction)
+            k = ring.index(min(ring))
+            ring = ring[k:] + ring[:k]
+            refs.append([arc(ring + ring[:1])])
+        else:
+            ring = ring[cuts[0]:] + ring[:cuts[0]]
+            cuts = [k - cuts[0] for k in cuts] + [len(ring)]
+            ring = ring + ring[:1]
+            refs.append([arc(ring[a:b + 1]) for a, b in zip(cuts, cuts[1:])])
+    return arcs, refs
+
+def simplify(rings, tolerance):
+    """ simplify returns closed rings simplified to within the tolerance
+        (NM) (see geodesy.simplify) keeping their topology: rings are cut
+        into arcs at their junctions (see cut) and each arc is simplified
+        once, so a boundary shared by adjacent rings is simplified the same
+        for both and they still meet exactly, and the junctions are kept.
+        Arcs are left whole where simplifying them would leave a ring of
+        fewer than three points.
+
+    Args:
+        rings: list of closed rings, each a list of (dlon, dlat) tuples
+        tolerance: NM e.g. 0.1 (0 for none)
+
+    Returns:
+        list of closed rings (each from a junction, or its least point)
+    """
+    if tolerance <= 0:
+        return [list(ring) for ring in rings]
+    open_rings = []
+    for ring in rings:
+        q = []
+        for p in ring:
+            p = tuple(p)
+            if not q or q[-1] != p:
+                q.append(p)
+        if len(q) > 1 and q[0] == q[-1]:
+            q.pop()
+        open_rings.append(q)
+    arcs, refs = cut(open_rings)
+    simplified = [geodesy.simplify(list(arc), tolerance) for arc in arcs]
+    whole = set() # arcs left whole
+    while True:
+        result = []
+        degenerate = set()
+        for ring, ring_refs in zip(rings, refs):
+            if not ring_refs:
+                result.append(list(ring))
+                continue
+            points = []
+            for k in ring_refs:
+                arc = simplified[k] if k >= 0 else simplified[~k][::-1]
+                points.extend(arc[1:] if points else arc)
+            if len(set(points)) < 3:
+                degenerate.update(k if k >= 0 else ~k for k in ring_refs)
+            result.append(points)
+        degenerate -= whole
+        if not degenerate:
+            return result
+        for k in degenerate:
+            simplified[k] = list(arcs[k])
+        whole |= degenerate
+
+def polygons_of(f):
+    """ polygons_of returns the polygons (lists of rings) of a feature.
+    """
+    geometry = f.get('geometry') or {}
+    if geometry.get('type') == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry.get('type') == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+if __name__ == "__main__":
+    main()